@@ -3,13 +3,25 @@ from tkinter import simpledialog, messagebox, Toplevel, filedialog, ttk
 import networkx as nx
 import math
 import json
+import io
+import itertools
 import random
-from PIL import ImageGrab
+import threading
+from collections import deque
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor
+from PIL import Image, ImageGrab
+
+try:
+    import orjson  # Optional: much faster JSON encode/decode for large architectures
+except ImportError:
+    orjson = None
 
 import config
-from utils import calculate_metric
+from utils import calculate_metrics, find_cycles, find_communities, format_avg_cycle_length, format_cycle_count
 from components import InteractiveComparisonPanel, CreateToolTip
 import metric_visualizations
+from history import HistoryRecorder, undo_ops, redo_ops, diff_graphs
 
 METRIC_DESCRIPTIONS = {
     "Density": "The ratio of actual connections to potential connections.\nHigh density = highly connected.",
@@ -27,6 +39,54 @@ METRIC_DESCRIPTIONS = {
     "Collaboration Ratio": "The percentage of functions that have shared authority.\nCould be a measure of system flexibility."
 }
 
+def _write_json(fp, data):
+    """Writes data as indented JSON in a single buffered write."""
+    if orjson:
+        with open(fp, 'wb') as f: f.write(orjson.dumps(data, option=orjson.OPT_INDENT_2))
+    else:
+        with open(fp, 'w', encoding='utf-8') as f: f.write(json.dumps(data, indent=4))
+
+def _read_json(fp):
+    """Reads a JSON file, tolerating a UTF-8 byte-order mark."""
+    with open(fp, 'rb') as f: raw = f.read()
+    if raw.startswith(b'\xef\xbb\xbf'): raw = raw[3:]
+    return orjson.loads(raw) if orjson else json.loads(raw.decode('utf-8'))
+
+def _centrality_scores(G):
+    """Node centralities for the comparison inspector; runs on a worker thread. Failed metrics map to None."""
+    scores = {}
+    for name, func, kwargs in (("degree", nx.degree_centrality, {}),
+                               ("betweenness", nx.betweenness_centrality, {}),
+                               ("eigenvector", nx.eigenvector_centrality, {"max_iter": 100, "tol": 1e-04})):
+        try: scores[name] = func(G, **kwargs)
+        except Exception: scores[name] = None
+    return scores
+
+def _outcode(x, y, bounds):
+    """Cohen-Sutherland region code of a point relative to the (x_min, y_min, x_max, y_max) viewport."""
+    x_min, y_min, x_max, y_max = bounds
+    return (1 if x < x_min else 2 if x > x_max else 0) | (4 if y < y_min else 8 if y > y_max else 0)
+
+# (row key, display label, color, visual analytics mode); the row key doubles as the calculate_metrics name
+STATS_ROWS = [
+    ("Density", "Density", "black", None), 
+    ("Cyclomatic Number", "Cyclomatic Number", "black", None),
+    ("Global Efficiency", "Global Efficiency", "black", None), 
+    ("Supportive Gain", "Supportive Gain", "black", None),
+    ("Brittleness Ratio", "Soft/Hard Ratio", "black", None), 
+    ("Critical Vulnerability", "Critical Vulnerability", "black", None),
+    ("Functional Redundancy", "Func. Redundancy", "black", None),
+    ("Agent Criticality", "Agent Criticality", "black", None),
+    ("Collaboration Ratio", "Collab. Ratio", "black", None),
+    ("Interdependence", "Interdependence", "blue", "interdependence"),
+    ("Total Cycles", "Total Cycles", "blue", "cycles"),
+    ("Avg Cycle Length", "Avg Cycle Length", "black", None),
+    ("Modularity", "Modularity", "blue", "modularity"),
+]
+
+# Rows filled in by the background worker rather than calculate_metrics
+ASYNC_STATS = ("Total Cycles", "Avg Cycle Length", "Modularity")
+
 class GraphBuilderApp:
     def __init__(self, root):
         self.root = root
@@ -35,9 +95,23 @@ class GraphBuilderApp:
         
         # Graph Backend
         self.G = nx.DiGraph()
+        # Next id for add_node. Only ever increases, so ids restored by undo can never collide with new nodes
+        self._next_node_id = 0
+        # Stored architectures: name -> (parent name, ops from parent) or (None, baseline graph)
         self.saved_archs = {} 
-        self.undo_stack = []
-        self.redo_stack = []
+        self._last_arch = None
+        self._replay_stamps = itertools.count()
+        self._arch_stamps = {}  # Name -> version stamp of its stored contents; reissued whenever they change
+        self.undo_stack = deque(maxlen=config.HISTORY_LIMIT)  # Oldest entries fall off automatically
+        self.redo_stack = deque(maxlen=config.HISTORY_LIMIT)
+        self._graph_version = 0
+        self._metric_cache = {}
+        self._centrality_cache = {}
+        self._async_metrics = {}
+        self._async_version = None
+        self._metric_pool = ThreadPoolExecutor(max_workers=2)  # Comparison-window metric columns and centralities
+        self._stats_ui = None  # Persistent stats widgets, created on first dashboard build
+        self._stats_state = None  # (graph version, async ready) currently shown in the stats section
         
         # Interaction State 
         self.selected_node = None     
@@ -45,10 +119,20 @@ class GraphBuilderApp:
         self.drag_node = None       
         self.drag_start_pos = None 
         self.is_dragging = False   
-        self.pre_drag_graph_state = None
+        self.pre_drag_pos = None
         self.sidebar_drag_data = None
         self.current_highlights = [] 
         self.active_vis_mode = None
+
+        # Canvas item caches, keyed by graph element: (item kinds, item ids, last specs drawn)
+        self._layer_items = {}
+        self._highlight_items = {}
+        self._edge_items = {}
+        self._node_items = {}
+
+        # Coarse world-space grid for node hit-testing, plus the draw positions it was built from; None while stale
+        self._spatial_grid = None
+        self._world_pos = {}
         self.is_sidebar_dragging = False
 
         # Viewport Settings
@@ -56,14 +140,22 @@ class GraphBuilderApp:
         self.offset_x = 0
         self.offset_y = 0
         self.pan_start = None 
+        self._redraw_pending = False
+        self._redraw_depth = 0  # Nesting level of batch_updates(); redraws are deferred while > 0
+        self._redraw_dirty = False
+        self._redraw_dash_dirty = False
+        self._viewport = None
+        self._culled_items = False
+        self._pan_since_redraw = 0
         
         # Application Modes
         self.mode = "SELECT"
         self.mode_buttons = {}
-        self.view_mode = config.VIEW_MODE_FREE
+        self.set_view_mode(config.VIEW_MODE_FREE)
         self.edge_view_mode = "ALL"
         
         self.agents = config.DEFAULT_AGENTS.copy()
+        self._strip_templates = {}  # Function-node fill strips per agent tuple; cleared when self.agents changes
         
         self.setup_ui()
         
@@ -89,6 +181,7 @@ class GraphBuilderApp:
         self.canvas.bind("<B1-Motion>", self.on_mouse_drag)
         self.canvas.bind("<ButtonRelease-1>", self.on_mouse_up)
         self.canvas.bind("<Double-Button-1>", self.on_double_click)
+        self.canvas.bind("<Configure>", lambda e: self.redraw(rebuild_dash=False))
         self.canvas.bind("<Button-3>", self.on_right_click) 
         self.canvas.bind("<Button-2>", self.on_right_click) 
         self.canvas.bind("<MouseWheel>", self.on_zoom)      
@@ -127,19 +220,22 @@ class GraphBuilderApp:
     def to_world(self, sx, sy):
         return (sx - self.offset_x) / self.zoom, (sy - self.offset_y) / self.zoom
 
-    def get_draw_pos(self, node_id):
-        """Calculates world coordinates. Snaps Y to layer if VIEW_MODE_JSAT is active."""
+    def set_view_mode(self, mode):
+        """Switches view mode and binds get_draw_pos to the matching specialization."""
+        self.view_mode = mode
+        self.get_draw_pos = self._draw_pos_free if mode == config.VIEW_MODE_FREE else self._draw_pos_jsat
+
+    def _draw_pos_free(self, node_id):
+        """World coordinates in free view: the stored position."""
+        return self.G.nodes[node_id].get('pos', (100, 100))
+
+    def _draw_pos_jsat(self, node_id):
+        """World coordinates in JSAT view: Y snaps to the node's layer, except while it is being dragged."""
         data = self.G.nodes[node_id]
         raw_x, raw_y = data.get('pos', (100, 100))
-        
-        if self.view_mode == config.VIEW_MODE_JSAT and self.drag_node == node_id and self.is_dragging:
-            return raw_x, raw_y
-        
-        if self.view_mode == config.VIEW_MODE_FREE:
+        if self.is_dragging and self.drag_node == node_id:
             return raw_x, raw_y
-            
-        layer = self.get_node_layer(data)
-        return raw_x, config.JSAT_LAYERS[layer]
+        return raw_x, config.JSAT_LAYERS[self.get_node_layer(data)]
 
     def get_node_layer(self, data):
         if 'layer' in data and data['layer'] in config.JSAT_LAYERS:
@@ -149,7 +245,7 @@ class GraphBuilderApp:
     def on_zoom(self, event, direction=None):
         factor = 1.1 if (direction or event.delta) > 0 else 0.9
         self.zoom *= factor
-        self.redraw()
+        self.redraw(rebuild_dash=False)
 
     def on_mouse_down(self, event):
         clicked_node = self._get_node_at(event.x, event.y)
@@ -159,7 +255,7 @@ class GraphBuilderApp:
             self._handle_background_press(event)
 
     def _handle_node_press(self, node_id, event):
-        self.pre_drag_graph_state = self.G.copy()
+        self.pre_drag_pos = self.G.nodes[node_id].get('pos')
         self.drag_node = node_id
         self.drag_start_pos = (event.x, event.y)
         self.is_dragging = False
@@ -168,8 +264,9 @@ class GraphBuilderApp:
         if self.mode == "DELETE":
             clicked_edge = self.find_edge_at(event.x, event.y)
             if clicked_edge:
-                self.save_state()
-                self.G.remove_edge(*clicked_edge)
+                u, v = clicked_edge
+                with self._record() as rec:
+                    rec.remove_edge(u, v)
                 self.redraw()
                 return
 
@@ -187,7 +284,8 @@ class GraphBuilderApp:
             if self.is_dragging:
                 wx, wy = self.to_world(event.x, event.y)
                 self.G.nodes[self.drag_node]['pos'] = (wx, wy)
-                self.redraw()
+                self._spatial_grid = None
+                self._schedule_redraw()
 
         # Handle Canvas Panning
         elif self.pan_start is not None:
@@ -199,7 +297,17 @@ class GraphBuilderApp:
                 self.offset_x += dx
                 self.offset_y += dy
                 self.pan_start = (event.x, event.y)
-                self.redraw()
+                
+                # A pan is a pure translation: shift existing items instead of redrawing.
+                # Layer guides span the full width, so they only follow vertical motion.
+                for tag in ("highlight", "edge", "node"):
+                    self.canvas.move(tag, dx, dy)
+                self.canvas.move("layer", 0, dy)
+                
+                # Items culled off-screen need a real redraw once they may have scrolled into view
+                self._pan_since_redraw += abs(dx) + abs(dy)
+                if self._culled_items and self._pan_since_redraw > config.VIEWPORT_MARGIN:
+                    self._schedule_redraw()
 
     def on_mouse_up(self, event):
         if self.drag_node is not None:
@@ -212,21 +320,26 @@ class GraphBuilderApp:
 
         elif self.pan_start is not None:
             if not self.is_dragging and self.mode in ["ADD_FUNC", "ADD_RES"]:
-                self.save_state()
                 wx, wy = self.to_world(event.x, event.y)
                 self.add_node(wx, wy)
             self.pan_start = None
             self.is_dragging = False
 
     def _finalize_drag(self, event):
-        self.save_state(state=self.pre_drag_graph_state)
+        node_id = self.drag_node
+        with self._record() as rec:
+            rec.set_node_attr(node_id, 'pos', self.G.nodes[node_id]['pos'], old=self.pre_drag_pos)
+            
+            if self.view_mode == config.VIEW_MODE_JSAT:
+                _, world_y = self.to_world(event.x, event.y)
+                new_layer = self.get_layer_from_y(world_y)
+                if new_layer and new_layer != self.G.nodes[node_id].get('layer'):
+                    rec.set_node_attr(node_id, 'layer', new_layer)
         
-        if self.view_mode == config.VIEW_MODE_JSAT:
-            _, world_y = self.to_world(event.x, event.y)
-            new_layer = self.get_layer_from_y(world_y)
-            if new_layer:
-                self.G.nodes[self.drag_node]['layer'] = new_layer
-                
+        # Drag state is cleared first so the index (and redraw) see the node snapped to its layer
+        self.drag_node = None
+        self.is_dragging = False
+        self._rebuild_spatial_index()
         self.redraw()
 
     def handle_click(self, node_id):
@@ -236,8 +349,9 @@ class GraphBuilderApp:
             self.redraw()
             
         elif self.mode == "DELETE": 
-            self.save_state()
-            self.G.remove_node(node_id)
+            with self._record() as rec:
+                rec.remove_node(node_id)
+            self._rebuild_spatial_index()
             self.inspected_node = None
             self.redraw()
             
@@ -263,57 +377,159 @@ class GraphBuilderApp:
             is_hard = messagebox.askyesno("Interdependency Type", "Is this a HARD constraint?\n\nYes = Essential (Hard)\nNo = Supportive (Soft)")
             edge_type = config.EDGE_TYPE_HARD if is_hard else config.EDGE_TYPE_SOFT
             
-            self.save_state()
-            self.G.add_edge(self.selected_node, node_id, type=edge_type)
+            with self._record() as rec:
+                if self.G.has_edge(self.selected_node, node_id):
+                    rec.set_edge_type(self.selected_node, node_id, edge_type)
+                else:
+                    rec.add_edge(self.selected_node, node_id, type=edge_type)
         
         self.selected_node = None
         self.redraw()
 
+    @contextmanager
+    def batch_updates(self):
+        """Defers redraw() calls made inside the block (reentrant) and repaints once on the outermost exit."""
+        self._redraw_depth += 1
+        try:
+            yield
+        finally:
+            self._redraw_depth -= 1
+            if self._redraw_depth == 0 and self._redraw_dirty:
+                rebuild_dash = self._redraw_dash_dirty
+                self._redraw_dirty = self._redraw_dash_dirty = False
+                self.redraw(rebuild_dash)
+
     def redraw(self, rebuild_dash=True):
-        self.canvas.delete("all")
+        if self._redraw_depth:
+            self._redraw_dirty = True
+            self._redraw_dash_dirty |= rebuild_dash
+            return
+        
+        self._screen_pos = self._compute_screen_positions()
+        self._viewport = self._compute_viewport()
+        self._culled_items = False
+        self._pan_since_redraw = 0
         
         if self.view_mode == config.VIEW_MODE_JSAT:
             self._draw_layer_lines()
+        else:
+            self._purge_items(self._layer_items, ())
             
         self._draw_highlights()
         self._draw_edges()
         self._draw_nodes()
         
+        # Items created this pass land on top; restore the layering order
+        for tag in ("highlight", "edge", "node"):
+            self.canvas.tag_raise(tag)
+        
         if rebuild_dash and not self.is_dragging:
             self.rebuild_dashboard()
 
+    def _schedule_redraw(self):
+        """Coalesces bursts of motion events into a single canvas redraw once Tk is idle."""
+        if not self._redraw_pending:
+            self._redraw_pending = True
+            self.root.after_idle(self._do_redraw)
+
+    def _do_redraw(self):
+        self._redraw_pending = False
+        self.redraw(rebuild_dash=False)
+
+    def _compute_viewport(self):
+        """Visible canvas bounds padded by a margin, or None before the canvas is mapped."""
+        w, h = self.canvas.winfo_width(), self.canvas.winfo_height()
+        if w <= 1 or h <= 1: return None
+        margin = config.NODE_RADIUS * self.zoom + config.VIEWPORT_MARGIN
+        return (-margin, -margin, w + margin, h + margin)
+
+    def _compute_screen_positions(self):
+        """Transforms every node's draw position to screen space in a single pass."""
+        zoom, ox, oy = self.zoom, self.offset_x, self.offset_y
+        screen = {}
+        if self.view_mode == config.VIEW_MODE_FREE:
+            for n, d in self.G.nodes(data=True):
+                wx, wy = d.get('pos', (100, 100))
+                screen[n] = (wx * zoom + ox, wy * zoom + oy)
+            return screen
+        
+        # JSAT mode: same snapping as get_draw_pos, inlined for the per-frame loop
+        layers, get_layer = config.JSAT_LAYERS, self.get_node_layer
+        dragged = self.drag_node if self.is_dragging else None
+        for n, d in self.G.nodes(data=True):
+            wx, wy = d.get('pos', (100, 100))
+            if n != dragged:
+                wy = layers[get_layer(d)]
+            screen[n] = (wx * zoom + ox, wy * zoom + oy)
+        return screen
+
+    def _sync_items(self, cache, key, specs):
+        """
+        Updates the cached canvas items for key in place, recreating them only if their shapes changed.
+        Coordinates and options are only sent to Tk when they differ from the last pass, so a redraw
+        that changes nothing (mode switch, selection of another node) costs no canvas calls.
+        Pans shift items and their would-be coords by the same amount, so the comparison stays valid.
+        """
+        kinds = tuple(kind for kind, _, _ in specs)
+        cached = cache.get(key)
+        if cached and cached[0] == kinds:
+            if cached[2] == specs: return
+            for item, (_, old_coords, old_opts), (_, coords, opts) in zip(cached[1], cached[2], specs):
+                if coords != old_coords: self.canvas.coords(item, *coords)
+                if opts != old_opts: self.canvas.itemconfig(item, **opts)
+            cache[key] = (kinds, cached[1], specs)
+            return
+        
+        if cached: self.canvas.delete(*cached[1])
+        cache[key] = (kinds, [getattr(self.canvas, f"create_{kind}")(*coords, **opts) for kind, coords, opts in specs], specs)
+
+    def _purge_items(self, cache, seen):
+        """Deletes canvas items whose graph element was not drawn this pass."""
+        for key in [k for k in cache if k not in seen]:
+            self.canvas.delete(*cache.pop(key)[1])
+
+    def _clear_canvas_cache(self):
+        for cache in (self._layer_items, self._highlight_items, self._edge_items, self._node_items):
+            self._purge_items(cache, ())
+
     def _draw_layer_lines(self):
         """Draws the horizontal guide lines for JSAT layers."""
-        for layer_name in config.LAYER_ORDER:
-            world_y = config.JSAT_LAYERS[layer_name]
-            _, screen_y = self.to_screen(0, world_y)
-            self.canvas.create_line(0, screen_y, 20000, screen_y, fill="#ddd", dash=(4, 4))
-            self.canvas.create_text(10, screen_y - 10, text=layer_name, anchor="w", fill="#888", font=("Arial", 8, "italic"))
+        zoom, oy = self.zoom, self.offset_y
+        for layer_name, world_y in config.LAYER_GUIDES:
+            screen_y = world_y * zoom + oy
+            self._sync_items(self._layer_items, layer_name, [
+                ("line", (0, screen_y, 20000, screen_y), dict(fill="#ddd", dash=(4, 4), tags=("layer",))),
+                ("text", (10, screen_y - 10), dict(text=layer_name, anchor="w", fill="#888", font=("Arial", 8, "italic"), tags=("layer",)))
+            ])
 
     def _draw_highlights(self):
         """Renders visual overlays for specific analytics (e.g., cycles, interdependence)."""
-        if not self.current_highlights: return
-        
+        seen = set()
         edge_counts = {}
-        for h in self.current_highlights:
+        pos = self._screen_pos
+        for i, h in enumerate(self.current_highlights):
             color = h.get('color', 'yellow')
             width = h.get('width', 8) * self.zoom
             
             for n in h.get('nodes', []):
-                wx, wy = self.get_draw_pos(n)
-                sx, sy = self.to_screen(wx, wy)
+                sx, sy = pos[n]
                 rad = (config.NODE_RADIUS * self.zoom) + (width/2)
-                self.canvas.create_oval(sx-rad, sy-rad, sx+rad, sy+rad, fill=color, outline=color)
+                key = (i, "node", n)
+                seen.add(key)
+                self._sync_items(self._highlight_items, key, [
+                    ("oval", (sx-rad, sy-rad, sx+rad, sy+rad), dict(fill=color, outline=color, tags=("highlight",)))
+                ])
             
+            # Consecutive edges (u->v, v->w, ...) are chained into one polyline item;
+            # the small jog between offset segments is hidden under the node highlight
+            runs, run, last = [], [], None
             for u, v in h.get('edges', []):
                 edge_key = tuple(sorted((u, v)))
                 count = edge_counts.get(edge_key, 0)
                 edge_counts[edge_key] = count + 1
                 
-                wx1, wy1 = self.get_draw_pos(u)
-                wx2, wy2 = self.get_draw_pos(v)
-                sx1, sy1 = self.to_screen(wx1, wy1)
-                sx2, sy2 = self.to_screen(wx2, wy2)
+                sx1, sy1 = pos[u]
+                sx2, sy2 = pos[v]
                 
                 offset_step = width / 2
                 current_offset = (count * width) - offset_step
@@ -324,91 +540,135 @@ class GraphBuilderApp:
                 nx_vec, ny_vec = -dy / length, dx / length
                 os_x, os_y = nx_vec * current_offset, ny_vec * current_offset
                 
-                self.canvas.create_line(sx1+os_x, sy1+os_y, sx2+os_x, sy2+os_y, 
-                                        fill=color, width=width, capstyle=tk.ROUND)
+                if u != last and run:
+                    runs.append(run)
+                    run = []
+                run.extend((sx1+os_x, sy1+os_y, sx2+os_x, sy2+os_y))
+                last = v
+            if run: runs.append(run)
+            
+            for j, coords in enumerate(runs):
+                key = (i, "path", j)
+                seen.add(key)
+                self._sync_items(self._highlight_items, key, [
+                    ("line", coords, dict(fill=color, width=width, capstyle=tk.ROUND, joinstyle=tk.ROUND, tags=("highlight",)))
+                ])
+        
+        self._purge_items(self._highlight_items, seen)
 
     def _draw_edges(self):
-        r = config.NODE_RADIUS * self.zoom
+        zoom = self.zoom
+        r = config.NODE_RADIUS * zoom
+        gap = r + 2
+        pos = self._screen_pos
+        viewport = self._viewport
+        sync, cache = self._sync_items, self._edge_items
+        hard, soft = config.EDGE_TYPE_HARD, config.EDGE_TYPE_SOFT
+        # (color, dash, width, type tag) per edge type, resolved once per pass
+        soft_style = (config.SOFT_EDGE_COLOR, config.SOFT_EDGE_DASH, 1.5 * zoom, f"edge_{soft}")
+        hard_style = (config.HARD_EDGE_COLOR, "", 2.0 * zoom, f"edge_{hard}")
+        seen = set()
         
         for u, v, d in self.G.edges(data=True):
-            e_type = d.get('type', config.EDGE_TYPE_HARD)
+            color, dash, width, type_tag = soft_style if d.get('type', hard) == soft else hard_style
+
+            sx1, sy1 = pos[u]
+            sx2, sy2 = pos[v]
             
-            if self.edge_view_mode != "ALL" and e_type != self.edge_view_mode:
+            # Trivial reject: both endpoints beyond the same side of the viewport
+            if viewport and _outcode(sx1, sy1, viewport) & _outcode(sx2, sy2, viewport):
+                self._culled_items = True
                 continue
-
-            is_soft = (e_type == config.EDGE_TYPE_SOFT)
-            color = config.SOFT_EDGE_COLOR if is_soft else config.HARD_EDGE_COLOR
-            dash = config.SOFT_EDGE_DASH if is_soft else None
-            width = (1.5 if is_soft else 2.0) * self.zoom
-
-            wx1, wy1 = self.get_draw_pos(u)
-            wx2, wy2 = self.get_draw_pos(v)
-            sx1, sy1 = self.to_screen(wx1, wy1)
-            sx2, sy2 = self.to_screen(wx2, wy2)
             
             dx, dy = sx2 - sx1, sy2 - sy1
             dist = math.hypot(dx, dy)
             if dist == 0: continue
             
             # Snap line to the node boundary
-            gap = r + 2
             tx = sx2 - (dx/dist)*gap
             ty = sy2 - (dy/dist)*gap
             
-            self.canvas.create_line(sx1, sy1, tx, ty, arrow=tk.LAST, width=width, fill=color, dash=dash)
+            seen.add((u, v))
+            sync(cache, (u, v), [
+                ("line", (sx1, sy1, tx, ty), dict(arrow=tk.LAST, width=width, fill=color, dash=dash, tags=("edge", type_tag, f"e_{u}_{v}")))
+            ])
+        
+        self._purge_items(cache, seen)
+        self._apply_edge_filter()
+
+    def _apply_edge_filter(self):
+        """Shows or hides edges by type tag; no geometry is rebuilt."""
+        for e_type in (config.EDGE_TYPE_HARD, config.EDGE_TYPE_SOFT):
+            visible = self.edge_view_mode in ("ALL", e_type)
+            self.canvas.itemconfigure(f"edge_{e_type}", state="normal" if visible else "hidden")
 
     def _draw_nodes(self):
-        r = config.NODE_RADIUS * self.zoom
-        font_size = max(15, int(10 * self.zoom))
+        zoom = self.zoom
+        r = config.NODE_RADIUS * zoom
+        font = ("Arial", max(15, int(10 * zoom)), "bold")
+        label_offset = r + (5 * zoom)
+        pos = self._screen_pos
+        viewport = self._viewport
+        selected, inspected = self.selected_node, self.inspected_node
+        sync, cache = self._sync_items, self._node_items
+        seen = set()
         
         for n, d in self.G.nodes(data=True):
-            wx, wy = self.get_draw_pos(n)
-            sx, sy = self.to_screen(wx, wy)
+            sx, sy = pos[n]
+            if viewport and not (viewport[0] <= sx <= viewport[2] and viewport[1] <= sy <= viewport[3]):
+                self._culled_items = True
+                continue
             
             ag_list = d.get('agent', ["Unassigned"])
-            if not isinstance(ag_list, list): ag_list = [ag_list]
             
             outline, width = "black", 1
-            if n == self.selected_node:
+            if n == selected:
                 outline, width = "blue", 3
-            elif n == self.inspected_node:
+            elif n == inspected:
                 outline, width = "orange", 3
             
             if d.get('type') == "Function":
-                self._draw_rect_node(sx, sy, r, ag_list, outline, width)
+                specs = self._rect_node_specs(sx, sy, r, ag_list, outline, width)
             else:
-                self._draw_circle_node(sx, sy, r, ag_list, outline, width)
+                specs = self._circle_node_specs(sx, sy, r, ag_list, outline, width)
                 
-            label_offset = r + (5 * self.zoom)
-            self.canvas.create_text(sx, sy-label_offset, text=d.get('label',''), font=("Arial", font_size, "bold"), anchor="s")
+            specs.append(("text", (sx, sy-label_offset), 
+                          dict(text=d.get('label',''), font=font, anchor="s", tags=("node",))))
+            seen.add(n)
+            sync(cache, n, specs)
+        
+        self._purge_items(cache, seen)
 
-    def _draw_rect_node(self, sx, sy, r, agents, outline, width):
+    def _rect_node_specs(self, sx, sy, r, agents, outline, width):
         """Renders Function nodes. Supports multi-agent assignment via vertical strips."""
-        total_w = (r * 2)
-        strip_w = total_w / len(agents)
-        start_x = sx - r
+        key = tuple(agents)
+        template = self._strip_templates.get(key)
+        if template is None:
+            count = len(agents)
+            template = [(i / count, (i + 1) / count, self.agents.get(ag, "white")) for i, ag in enumerate(agents)]
+            self._strip_templates[key] = template
         
-        for i, ag in enumerate(agents):
-            fill = self.agents.get(ag, "white")
-            x1 = start_x + (i * strip_w)
-            x2 = start_x + ((i + 1) * strip_w)
-            self.canvas.create_rectangle(x1, sy-r, x2, sy+r, fill=fill, outline="")
-            
-        self.canvas.create_rectangle(sx-r, sy-r, sx+r, sy+r, fill="", outline=outline, width=width)
+        start_x, total_w = sx - r, r * 2
+        specs = [("rectangle", (start_x + f1 * total_w, sy-r, start_x + f2 * total_w, sy+r), dict(fill=fill, outline="", tags=("node",)))
+                 for f1, f2, fill in template]
+        specs.append(("rectangle", (sx-r, sy-r, sx+r, sy+r), dict(fill="", outline=outline, width=width, tags=("node",))))
+        return specs
 
-    def _draw_circle_node(self, sx, sy, r, agents, outline, width):
+    def _circle_node_specs(self, sx, sy, r, agents, outline, width):
         """Renders Resource nodes. Supports multi-agent assignment via radial wedges."""
         if len(agents) == 1:
             fill = self.agents.get(agents[0], "white")
-            self.canvas.create_oval(sx-r, sy-r, sx+r, sy+r, fill=fill, outline=outline, width=width)
-        else:
-            extent = 360 / len(agents)
-            start_angle = 90
-            for ag in agents:
-                fill = self.agents.get(ag, "white")
-                self.canvas.create_arc(sx-r, sy-r, sx+r, sy+r, start=start_angle, extent=extent, fill=fill, outline="")
-                start_angle += extent
-            self.canvas.create_oval(sx-r, sy-r, sx+r, sy+r, fill="", outline=outline, width=width)
+            return [("oval", (sx-r, sy-r, sx+r, sy+r), dict(fill=fill, outline=outline, width=width, tags=("node",)))]
+        
+        specs = []
+        extent = 360 / len(agents)
+        start_angle = 90
+        for ag in agents:
+            fill = self.agents.get(ag, "white")
+            specs.append(("arc", (sx-r, sy-r, sx+r, sy+r), dict(start=start_angle, extent=extent, fill=fill, outline="", tags=("node",))))
+            start_angle += extent
+        specs.append(("oval", (sx-r, sy-r, sx+r, sy+r), dict(fill="", outline=outline, width=width, tags=("node",))))
+        return specs
 
     def rebuild_dashboard(self):
         self.agent_ui_frames = {}
@@ -417,7 +677,9 @@ class GraphBuilderApp:
         except: scroll_pos = 0.0
 
         for w in self.inspector_frame.winfo_children(): w.destroy()
-        for w in self.scrollable_content.winfo_children(): w.destroy()
+        keep = self._stats_ui['widgets'] if self._stats_ui else ()
+        for w in self.scrollable_content.winfo_children():
+            if w not in keep: w.destroy()
 
         self._build_stats_section()
         self._build_agent_section()
@@ -427,60 +689,113 @@ class GraphBuilderApp:
         self.scroll_canvas.configure(scrollregion=self.scroll_canvas.bbox("all"))
         self.scroll_canvas.yview_moveto(scroll_pos)
 
-    def _build_stats_section(self):
-        tk.Label(self.scrollable_content, text="Network Statistics", font=("Arial", 14, "bold"), bg="#f0f0f0").pack(fill=tk.X, pady=(10, 5))
+    def _mark_graph_changed(self):
+        """Bumps the graph version so cached analytics are recomputed on next use."""
+        self._graph_version += 1
+        self.G.graph['version'] = self._graph_version  # Keys the shared analytics caches in utils
+        self._centrality_cache.clear()
+
+    def _cached(self, key, fn):
+        """Memoizes an expensive analytic for the current graph version."""
+        cache_key = (self._graph_version, key)
+        if cache_key not in self._metric_cache:
+            if any(v != self._graph_version for v, _ in self._metric_cache):
+                self._metric_cache.clear()
+            self._metric_cache[cache_key] = fn()
+        return self._metric_cache[cache_key]
+
+    def _create_stats_ui(self):
+        """Builds the stats rows and their tooltips once; later rebuilds only update label text."""
+        header = tk.Label(self.scrollable_content, text="Network Statistics", font=("Arial", 14, "bold"), bg="#f0f0f0")
+        header.pack(fill=tk.X, pady=(10, 5))
         stats_frame = tk.Frame(self.scrollable_content, bg="white", bd=1, relief=tk.SOLID)
         stats_frame.pack(fill=tk.X, padx=5)
 
-        def add_row(text, color="black", callback=None, metric_key=None):
-            lbl = tk.Label(stats_frame, text=text, bg="white", fg=color)
-            if callback:
+        rows, hosts = {}, {}
+        for key, label, color, mode in STATS_ROWS:
+            lbl = tk.Label(stats_frame, text=f"{label}: …", bg="white", fg=color)
+            if mode:
                 lbl.config(cursor="hand2")
-                lbl.bind("<Button-1>", lambda e: callback())
+                lbl.bind("<Button-1>", lambda e, m=mode: self.trigger_visual_analytics(m))
             lbl.pack(anchor="w", padx=5)
-            if metric_key and metric_key in METRIC_DESCRIPTIONS:
-                CreateToolTip(lbl, METRIC_DESCRIPTIONS[metric_key])
-
-        metrics_config = [
-            ("Density", "Density"), 
-            ("Cyclomatic Number", "Cyclomatic Number"),
-            ("Global Efficiency", "Global Efficiency"), 
-            ("Supportive Gain", "Supportive Gain"),
-            ("Soft/Hard Ratio", "Brittleness Ratio"), 
-            ("Critical Vulnerability", "Critical Vulnerability"),
-            ("Func. Redundancy", "Functional Redundancy"),
-            ("Agent Criticality", "Agent Criticality"),
-            ("Collab. Ratio", "Collaboration Ratio")
-        ]
-        
-        for label, key in metrics_config:
-            val = calculate_metric(self.G, key)
-            add_row(f"{label}: {val}", metric_key=key)
-
-        add_row(f"Interdependence: {calculate_metric(self.G, 'Interdependence')}", "blue", 
-                lambda: self.trigger_visual_analytics("interdependence"), "Interdependence")
-        
-        add_row(f"Total Cycles: {calculate_metric(self.G, 'Total Cycles')}", "blue", 
-                lambda: self.trigger_visual_analytics("cycles"), "Total Cycles")
-        
-        cycles = list(nx.simple_cycles(self.G))
-        avg_len = sum(len(c) for c in cycles) / len(cycles) if cycles else 0.0
-        add_row(f"Avg Cycle Length: {avg_len:.2f}", metric_key="Avg Cycle Length")
+            if key in METRIC_DESCRIPTIONS:
+                CreateToolTip(lbl, METRIC_DESCRIPTIONS[key])
+            rows[key] = (lbl, label)
+            
+            # Cycle and community lists sit under their rows and are rebuilt per graph version
+            if key in ("Avg Cycle Length", "Modularity"):
+                hosts[key] = tk.Frame(stats_frame, bg="white")
+                hosts[key].pack(fill=tk.X)
+
+        self._stats_ui = {'widgets': (header, stats_frame), 'rows': rows, 'hosts': hosts}
+
+    def _build_stats_section(self):
+        if self._stats_ui is None:
+            self._create_stats_ui()
+        
+        # Cycle enumeration and community detection run off the UI thread
+        results = self._async_metrics.get(self._graph_version)
+        state = (self._graph_version, results is not None)
+        if state == self._stats_state: return
+        self._stats_state = state
+        
+        rows, hosts = self._stats_ui['rows'], self._stats_ui['hosts']
+        def set_row(key, value):
+            lbl, label = rows[key]
+            lbl.config(text=f"{label}: {value}")
+        
+        sync_keys = [key for key, _, _, _ in STATS_ROWS if key not in ASYNC_STATS]
+        for key, value in self._cached("sync_stats", lambda: calculate_metrics(self.G, sync_keys)).items():
+            set_row(key, value)
+        
+        for host in hosts.values():
+            for w in host.winfo_children(): w.destroy()
+        
+        if results is None:
+            for key in ASYNC_STATS:
+                set_row(key, "…")
+            self._kick_async_metrics()
+            return
+        
+        (cycles, truncated), comms, mod_val = results
+        set_row("Total Cycles", format_cycle_count(cycles, truncated))
+        set_row("Avg Cycle Length", format_avg_cycle_length(cycles, truncated))
+        
+        # Tooltip texts are built on hover; joining labels for up to MAX_CYCLES cycles up front is wasted work
+        nodes = self.G.nodes
+        def node_names(ns, sep): return sep.join(str(nodes[n].get('label', n)) for n in ns)
         
         if cycles:
-            items = [{'label': len(c), 'tooltip': f"Cycle {i+1}:\n" + " -> ".join([str(self.G.nodes[n].get('label', n)) for n in c])} for i, c in enumerate(cycles)]
-            self._create_scrollable_list_ui(stats_frame, "", items, ["blue"], lambda idx: self.trigger_single_cycle_vis(idx)).pack(fill=tk.X, padx=5, pady=2)
-
+            items = [{'label': len(c), 'tooltip': lambda i=i, c=c: f"Cycle {i+1}:\n" + node_names(c, " -> ")} for i, c in enumerate(cycles)]
+            self._create_scrollable_list_ui(hosts["Avg Cycle Length"], "", items, ["blue"], lambda idx: self.trigger_single_cycle_vis(idx)).pack(fill=tk.X, padx=5, pady=2)
+
+        set_row("Modularity", mod_val)
+        if comms:
+            mod_items = [{'label': len(c), 'tooltip': lambda i=i, c=c: f"Group {i+1}:\n" + node_names(c, ", ")} for i, c in enumerate(comms)]
+            self._create_scrollable_list_ui(hosts["Modularity"], "", mod_items, ["blue"], lambda idx: self.trigger_single_modularity_vis(idx)).pack(fill=tk.X, padx=5, pady=2)
+
+    def _kick_async_metrics(self):
+        """Starts a background computation of the heavy stats for the current graph version."""
+        if self._async_version == self._graph_version: return
+        self._async_version = self._graph_version
+        snapshot = self.G.copy()
+        threading.Thread(target=self._compute_async, args=(self._graph_version, snapshot), daemon=True).start()
+
+    def _compute_async(self, version, G):
+        """Worker thread body. Only touches the snapshot; results are handed back via root.after."""
+        cycles = find_cycles(G)
         try:
-            mod_val = calculate_metric(self.G, 'Modularity')
-            add_row(f"Modularity: {mod_val}", "blue", lambda: self.trigger_visual_analytics("modularity"), "Modularity")
-            
-            comms = sorted(nx.community.greedy_modularity_communities(self.G.to_undirected()), key=len, reverse=True)
-            if comms:
-                mod_items = [{'label': len(c), 'tooltip': f"Group {i+1}:\n" + ", ".join([str(self.G.nodes[n].get('label', n)) for n in c])} for i, c in enumerate(comms)]
-                self._create_scrollable_list_ui(stats_frame, "", mod_items, ["blue"], lambda idx: self.trigger_single_modularity_vis(idx)).pack(fill=tk.X, padx=5, pady=2)
-        except:
-            add_row("Modularity: Err")
+            comms, q = find_communities(G)
+            mod_val = f"Q={q:.2f} ({len(comms)} Grps)"
+        except Exception:
+            comms, mod_val = None, "Err"
+        self.root.after(0, self._install_async_results, version, cycles, comms, mod_val)
+
+    def _install_async_results(self, version, cycles, comms, mod_val):
+        if version != self._graph_version: return
+        self._async_metrics = {version: (cycles, comms, mod_val)}
+        if not self.is_dragging:
+            self.rebuild_dashboard()
 
     def _build_agent_section(self):
         tk.Label(self.scrollable_content, text="Agent Overview", font=("Arial", 14, "bold"), bg="#f0f0f0").pack(fill=tk.X, pady=(15, 2))
@@ -489,14 +804,12 @@ class GraphBuilderApp:
         ctrl.pack(fill=tk.X, padx=5, pady=5)
         tk.Button(ctrl, text="New Agent", command=self.create_agent, bg="white").pack(pady=5)
 
-        agent_map = {name: [] for name in self.agents}
-        for n, d in self.G.nodes(data=True):
-            ag_list = d.get('agent', ["Unassigned"])
-            if not isinstance(ag_list, list): ag_list = [ag_list]
-            for ag in ag_list:
-                target = ag if ag in agent_map else "Unassigned"
-                if target not in agent_map: agent_map[target] = []
-                agent_map[target].append(n)
+        agent_index = self._cached("agent_index", self._build_agent_index)
+        # Nodes naming an agent that no longer exists fall back to Unassigned
+        agent_map = {name: agent_index.get(name, []) for name in self.agents}
+        orphans = [n for ag, nodes in agent_index.items() if ag not in agent_map for n in nodes]
+        if orphans:
+            agent_map["Unassigned"] = agent_map.get("Unassigned", []) + orphans
 
         for name, color in self.agents.items():
             af = tk.Frame(self.scrollable_content, bg="#e0e0e0", bd=1, relief=tk.RAISED)
@@ -525,6 +838,15 @@ class GraphBuilderApp:
             else:
                 tk.Label(af, text="(Empty)", bg="#e0e0e0", fg="#666", font=("Arial", 8, "italic")).pack(anchor="w", padx=10)
 
+    def _build_agent_index(self):
+        """Maps each agent name found on the graph to its nodes, in graph order. Rebuilt once per graph version."""
+        index = {}
+        for n, d in self.G.nodes(data=True):
+            ag_list = d.get('agent', ["Unassigned"])
+            for ag in ag_list:
+                index.setdefault(ag, []).append(n)
+        return index
+
     def _build_inspector_section(self):
         if self.inspected_node is None or not self.G.has_node(self.inspected_node):
             tk.Label(self.inspector_frame, text="(Select a node to inspect)", bg="#fff8e1", fg="#888").pack(pady=5)
@@ -544,23 +866,30 @@ class GraphBuilderApp:
         layer_box.pack(side=tk.LEFT, padx=5)
         
         def on_layer_change(event):
-            self.save_state()
-            self.G.nodes[self.inspected_node]['layer'] = layer_var.get()
+            with self._record() as rec:
+                rec.set_node_attr(self.inspected_node, 'layer', layer_var.get())
+            self._rebuild_spatial_index()
             self.redraw()
         layer_box.bind("<<ComboboxSelected>>", on_layer_change)
 
-        def safe_metric(func, **kwargs):
-            try: return f"{func(self.G, **kwargs)[self.inspected_node]:.3f}"
-            except: return "0.000"
-
         stats = (f"In-Degree:     {self.G.in_degree(self.inspected_node)}\n"
                  f"Out-Degree:    {self.G.out_degree(self.inspected_node)}\n"
-                 f"Degree Cent.:  {safe_metric(nx.degree_centrality)}\n"
-                 f"Eigenvector:   {safe_metric(nx.eigenvector_centrality, max_iter=100, tol=1e-04)}\n"
-                 f"Betweenness:   {safe_metric(nx.betweenness_centrality)}")
+                 f"Degree Cent.:  {self._safe_metric('degree', nx.degree_centrality)}\n"
+                 f"Eigenvector:   {self._safe_metric('eigenvector', nx.eigenvector_centrality, max_iter=100, tol=1e-04)}\n"
+                 f"Betweenness:   {self._safe_metric('betweenness', nx.betweenness_centrality)}")
         
         tk.Label(self.inspector_frame, text=stats, bg="#fff8e1", justify=tk.LEFT, font=("Consolas", 13)).pack(anchor="w", padx=5, pady=5)
 
+    def _safe_metric(self, name, func, **kwargs):
+        """Formats the inspected node's centrality, computing the whole-graph result once per version."""
+        key = (self._graph_version, name)
+        if key not in self._centrality_cache:
+            try: self._centrality_cache[key] = func(self.G, **kwargs)
+            except: self._centrality_cache[key] = {}
+        
+        try: return f"{self._centrality_cache[key][self.inspected_node]:.3f}"
+        except: return "0.000"
+
     def _create_scrollable_list_ui(self, parent, label_text, items, colors, click_callback, label_click_callback=None):
         container = tk.Frame(parent, bg=parent.cget('bg'))
         
@@ -635,12 +964,13 @@ class GraphBuilderApp:
 
     def set_edge_view(self, mode):
         self.edge_view_mode = mode
-        self.redraw()
+        self._apply_edge_filter()
 
     def toggle_view(self):
         is_free = (self.view_mode == config.VIEW_MODE_FREE)
-        self.view_mode = config.VIEW_MODE_JSAT if is_free else config.VIEW_MODE_FREE
+        self.set_view_mode(config.VIEW_MODE_JSAT if is_free else config.VIEW_MODE_FREE)
         self.view_btn.config(text="👁 View: JSAT Layers" if is_free else "👁 View: Free")
+        self._rebuild_spatial_index()
         self.redraw()
 
     def create_mode_button(self, parent, mode_key, text):
@@ -650,10 +980,13 @@ class GraphBuilderApp:
 
     def set_mode(self, m): 
         self.mode = m
-        self.selected_node = None
         self.status_label.config(text=f"Mode: {m}")
         self.update_mode_indicator()
-        self.redraw()
+        
+        # Mode is UI chrome; the canvas only changes if a pending edge-start selection is dropped
+        if self.selected_node is not None:
+            self.selected_node = None
+            self.redraw(rebuild_dash=False)
     
     def update_mode_indicator(self):
         for mode_key, btn in self.mode_buttons.items():
@@ -661,21 +994,6 @@ class GraphBuilderApp:
             btn.config(bg="#87CEFA" if is_active else ("#ffcccc" if mode_key == "DELETE" else "#f0f0f0"), 
                        relief=tk.SUNKEN if is_active else tk.RAISED)
 
-    def assign_agent_logic(self, node_id, agent_name):
-        current_data = self.G.nodes[node_id].get('agent', ["Unassigned"])
-        if not isinstance(current_data, list): current_data = [current_data]
-        
-        if "Unassigned" in current_data and agent_name != "Unassigned":
-            current_data.remove("Unassigned")
-            
-        if agent_name in current_data:
-            current_data.remove(agent_name)
-            if not current_data: current_data = ["Unassigned"]
-        else:
-            current_data.append(agent_name)
-            
-        self.G.nodes[node_id]['agent'] = current_data
-
     def on_double_click(self, event):
         node = self._get_node_at(event.x, event.y)
         if node is not None:
@@ -687,11 +1005,43 @@ class GraphBuilderApp:
             u, v = edge
             curr = self.G.edges[u, v].get('type', config.EDGE_TYPE_HARD)
             new_type = config.EDGE_TYPE_SOFT if curr == config.EDGE_TYPE_HARD else config.EDGE_TYPE_HARD
-            self.save_state()
-            self.G.edges[u, v]['type'] = new_type
+            with self._record() as rec:
+                rec.set_edge_type(u, v, new_type)
             self.redraw()
 
+    def _rebuild_spatial_index(self):
+        """Buckets nodes by the world-space grid cell of their drawn position."""
+        cell = config.SPATIAL_CELL_SIZE
+        grid, world = {}, {}
+        get_pos = self.get_draw_pos
+        for n in self.G.nodes:
+            wx, wy = world[n] = get_pos(n)
+            grid.setdefault((int(wx // cell), int(wy // cell)), []).append(n)
+        self._spatial_grid = grid
+        self._world_pos = world
+
+    def _world_positions(self):
+        """Draw positions of all nodes in world space, from the spatial index when it is current."""
+        if self._spatial_grid is not None: return self._world_pos
+        return {n: self.get_draw_pos(n) for n in self.G.nodes}
+
     def _get_node_at(self, x, y):
+        if self._spatial_grid is not None:
+            wx, wy = self.to_world(x, y)
+            cell = config.SPATIAL_CELL_SIZE
+            cx, cy = int(wx // cell), int(wy // cell)
+            world = self._world_pos
+            best, best_d2 = None, config.NODE_RADIUS ** 2
+            for gx in (cx - 1, cx, cx + 1):
+                for gy in (cy - 1, cy, cy + 1):
+                    for n in self._spatial_grid.get((gx, gy), ()):
+                        px, py = world[n]
+                        d2 = (wx - px) ** 2 + (wy - py) ** 2
+                        if d2 <= best_d2:
+                            best, best_d2 = n, d2
+            return best
+
+        # Linear fallback while the index is stale (e.g., mid-drag)
         r_screen = config.NODE_RADIUS * self.zoom
         for n in self.G.nodes:
             wx, wy = self.get_draw_pos(n)
@@ -710,18 +1060,21 @@ class GraphBuilderApp:
         e_lbl.pack()
         
         def save():
-            self.save_state()
-            self.G.nodes[nid]['label'] = e_lbl.get()
+            with self._record() as rec:
+                rec.set_node_attr(nid, 'label', e_lbl.get())
             win.destroy()
             self.redraw()
             
         tk.Button(win, text="Save", command=save).pack(pady=10)
 
     def add_node(self, x, y):
-        nid = (max(self.G.nodes)+1) if self.G.nodes else 0
+        nid = self._next_node_id
+        self._next_node_id += 1
         typ = "Function" if self.mode == "ADD_FUNC" else "Resource"
-        self.G.add_node(nid, pos=(x, y), type=typ, agent="Unassigned", 
-                        label=typ[0], layer=("Base Environment" if typ == "Resource" else "Distributed Work"))
+        with self._record() as rec:
+            rec.add_node(nid, pos=(x, y), type=typ, agent=["Unassigned"], 
+                         label=typ[0], layer=("Base Environment" if typ == "Resource" else "Distributed Work"))
+        self._rebuild_spatial_index()
         self.redraw()
 
     def create_agent(self):
@@ -729,6 +1082,7 @@ class GraphBuilderApp:
         if n and n not in self.agents:
             c = simpledialog.askstring("Input", "Color:") or "grey"
             self.agents[n] = c
+            self._strip_templates.clear()
             self.rebuild_dashboard()
     
     def edit_agent(self, agent_name):
@@ -742,61 +1096,84 @@ class GraphBuilderApp:
         def save():
             new_name, new_color = ne.get(), ce.get()
             if new_name and new_color:
-                self.save_state()
-                del self.agents[agent_name]
-                self.agents[new_name] = new_color
-                
-                for n, d in self.G.nodes(data=True): 
-                    ag = d.get('agent')
-                    if ag == agent_name: self.G.nodes[n]['agent'] = new_name
-                    elif isinstance(ag, list) and agent_name in ag:
-                        idx = ag.index(agent_name)
-                        ag[idx] = new_name
-                
-                self.redraw()
+                with self.batch_updates():
+                    del self.agents[agent_name]
+                    self.agents[new_name] = new_color
+                    self._strip_templates.clear()
+                    
+                    with self._record() as rec:
+                        for n, d in self.G.nodes(data=True): 
+                            ag = d.get('agent', [])
+                            if agent_name in ag:
+                                rec.set_node_attr(n, 'agent', [new_name if a == agent_name else a for a in ag])
+                    
+                    self.redraw()
                 win.destroy()
 
         def delete():
             if agent_name == "Unassigned": return
             if messagebox.askyesno("Delete", f"Delete '{agent_name}'?"):
-                self.save_state()
-                for n, d in self.G.nodes(data=True):
-                    ag = d.get('agent')
-                    if isinstance(ag, list):
-                        if agent_name in ag: ag.remove(agent_name)
-                        if not ag: self.G.nodes[n]['agent'] = ["Unassigned"]
-                del self.agents[agent_name]
-                self.redraw()
+                with self.batch_updates():
+                    with self._record() as rec:
+                        for n, d in self.G.nodes(data=True):
+                            ag = d.get('agent', [])
+                            if agent_name in ag or not ag:
+                                rec.set_node_attr(n, 'agent', [a for a in ag if a != agent_name] or ["Unassigned"])
+                    del self.agents[agent_name]
+                    self._strip_templates.clear()
+                    self.redraw()
                 win.destroy()
 
         tk.Button(win, text="Save", command=save, bg="#e1bee7").pack(pady=15, fill=tk.X, padx=20)
         tk.Button(win, text="Delete", command=delete, bg="#ffcccc").pack(pady=5, fill=tk.X, padx=20)
 
-    def save_state(self, state=None):
-        snapshot = state if state else self.G.copy()
-        self.undo_stack.append(snapshot)
-        if len(self.undo_stack) > config.HISTORY_LIMIT: self.undo_stack.pop(0)
+    @contextmanager
+    def _record(self):
+        """Journals the mutations made through the yielded recorder as one undoable edit."""
+        rec = HistoryRecorder(self.G)
+        try:
+            yield rec
+        except Exception:
+            undo_ops(self.G, rec.ops)
+            raise
+        if not rec.ops: return
+        self.undo_stack.append(rec.ops)
         self.redo_stack.clear()
+        self._mark_graph_changed()
     
     def undo(self):
         if self.undo_stack: 
-            self.redo_stack.append(self.G.copy())
-            self.G = self.undo_stack.pop()
+            ops = self.undo_stack.pop()
+            undo_ops(self.G, ops)
+            self.redo_stack.append(ops)
+            self._mark_graph_changed()
+            self._rebuild_spatial_index()
             self.redraw()
             
     def redo(self):
         if self.redo_stack: 
-            self.undo_stack.append(self.G.copy())
-            self.G = self.redo_stack.pop()
+            ops = self.redo_stack.pop()
+            redo_ops(self.G, ops)
+            self.undo_stack.append(ops)
+            self._mark_graph_changed()
+            self._rebuild_spatial_index()
             self.redraw()
 
     def export_as_image(self):
         fp = filedialog.asksaveasfilename(defaultextension=".png", filetypes=[("PNG", "*.png")])
         if not fp: return
         try:
-            x, y = self.canvas.winfo_rootx(), self.canvas.winfo_rooty()
             w, h = self.canvas.winfo_width(), self.canvas.winfo_height()
-            ImageGrab.grab(bbox=(x, y, x+w, y+h)).save(fp)
+            try:
+                # Render the canvas itself, so occluding windows and monitor layout don't matter
+                ps = self.canvas.postscript(colormode='color', x=0, y=0, width=w, height=h)
+                img = Image.open(io.BytesIO(ps.encode('utf-8')))
+                img.load(scale=2)
+                img.convert("RGB").save(fp)
+            except OSError:
+                # EPS decoding needs Ghostscript; fall back to a screen grab without it
+                x, y = self.canvas.winfo_rootx(), self.canvas.winfo_rooty()
+                ImageGrab.grab(bbox=(x, y, x+w, y+h)).save(fp)
             messagebox.showinfo("Success", f"Saved to {fp}")
         except Exception as e:
             messagebox.showerror("Error", str(e))
@@ -807,26 +1184,22 @@ class GraphBuilderApp:
         if not fp: return
 
         nodes_dict = {}
+        label_of = {}
         agent_authorities = {name: [] for name in self.agents}
         
         for nid, d in self.G.nodes(data=True):
-            lbl = d.get('label', f"Node_{nid}")
+            lbl = label_of[nid] = d.get('label', f"Node_{nid}")
             layer = d.get('layer', "Base Environment").replace(" ", "")
             typ = d.get('type', "Function")
             nodes_dict[lbl] = {"Type": f"{layer}{typ}", "UserData": lbl}
             
             ag_list = d.get('agent', ["Unassigned"])
-            if not isinstance(ag_list, list): ag_list = [ag_list]
             for ag in ag_list:
                 if ag in agent_authorities: agent_authorities[ag].append(lbl)
 
-        edges_list = []
-        for u, v, d in self.G.edges(data=True): 
-            edges_list.append({
-                "Source": self.G.nodes[u].get('label', f"Node_{u}"),
-                "Target": self.G.nodes[v].get('label', f"Node_{v}"),
-                "UserData": {"type": d.get('type', config.EDGE_TYPE_HARD)}
-            })
+        hard = config.EDGE_TYPE_HARD
+        edges_list = [{"Source": label_of[u], "Target": label_of[v], "UserData": {"type": d.get('type', hard)}}
+                      for u, v, d in self.G.edges(data=True)]
 
         final = {"GraphData": {
             "Nodes": nodes_dict, 
@@ -834,52 +1207,62 @@ class GraphBuilderApp:
             "Agents": {name: {"Authority": auth} for name, auth in agent_authorities.items()}
         }}
 
-        with open(fp, 'w') as f: json.dump(final, f, indent=4)
+        _write_json(fp, final)
 
     def load_from_json(self):
         fp = filedialog.askopenfilename()
         if not fp: return
-        try:
-            with open(fp, 'r', encoding='utf-8-sig') as f: data = json.load(f)["GraphData"]
-            
-            self.save_state()
-            self.G.clear()
-            self.agents = config.DEFAULT_AGENTS.copy()
-            
-            label_to_agents = {}
-            for ag_name, ag_data in data.get("Agents", {}).items():
-                if ag_name not in self.agents: 
-                    self.agents[ag_name] = "#" + ''.join([random.choice('ABCDEF89') for _ in range(6)])
-                for node_lbl in ag_data.get("Authority", []):
-                    label_to_agents.setdefault(node_lbl, []).append(ag_name)
-            
-            label_to_id = {}
-            layer_counters = {l: 100 for l in config.LAYER_ORDER}
-            
-            for i, (lbl, props) in enumerate(data.get("Nodes", {}).items()):
-                n_type, n_layer = self._parse_node_attributes(props.get("Type", ""))
-                pos_y = config.JSAT_LAYERS.get(n_layer, 550)
-                pos_x = layer_counters.get(n_layer, 100)
-                layer_counters[n_layer] = pos_x + 120
+        with self.batch_updates():
+            try:
+                data = _read_json(fp)["GraphData"]
                 
-                assigned = label_to_agents.get(lbl, ["Unassigned"])
-                self.G.add_node(i, pos=(pos_x, pos_y), layer=n_layer, type=n_type, 
-                                label=props.get("UserData", lbl), agent=assigned)
-                label_to_id[lbl] = i
-
-            for e in data.get("Edges", []):
-                u, v = label_to_id.get(e["Source"]), label_to_id.get(e["Target"])
-                if u is not None and v is not None:
-                    self.G.add_edge(u, v, type=e.get("UserData", {}).get("type", config.EDGE_TYPE_HARD))
-            
-            self.redraw()
-        except Exception as e:
-            messagebox.showerror("Error", f"Failed to load: {e}")
+                agents = config.DEFAULT_AGENTS.copy()
+                label_to_agents = {}
+                for ag_name, ag_data in data.get("Agents", {}).items():
+                    if ag_name not in agents: 
+                        agents[ag_name] = "#" + ''.join([random.choice('ABCDEF89') for _ in range(6)])
+                    for node_lbl in ag_data.get("Authority", []):
+                        label_to_agents.setdefault(node_lbl, []).append(ag_name)
+                
+                # The whole load is one undoable edit; a failure part-way reverts to the previous graph
+                with self._record() as rec:
+                    rec.clear()
+                    label_to_id = {}
+                    layer_counters = {l: 100 for l in config.LAYER_ORDER}
+                    
+                    for i, (lbl, props) in enumerate(data.get("Nodes", {}).items()):
+                        n_type, n_layer = self._parse_node_attributes(props.get("Type", ""))
+                        pos_y = config.JSAT_LAYERS.get(n_layer, 550)
+                        pos_x = layer_counters.get(n_layer, 100)
+                        layer_counters[n_layer] = pos_x + 120
+                        
+                        assigned = label_to_agents.get(lbl, ["Unassigned"])
+                        rec.add_node(i, pos=(pos_x, pos_y), layer=n_layer, type=n_type, 
+                                     label=props.get("UserData", lbl), agent=assigned)
+                        label_to_id[lbl] = i
+
+                    for e in data.get("Edges", []):
+                        u, v = label_to_id.get(e["Source"]), label_to_id.get(e["Target"])
+                        if u is None or v is None: continue
+                        e_type = e.get("UserData", {}).get("type", config.EDGE_TYPE_HARD)
+                        # Repeated node labels save as repeated edges; the last one wins, as add_edge would
+                        if self.G.has_edge(u, v):
+                            if self.G.edges[u, v].get('type') != e_type: rec.set_edge_type(u, v, e_type)
+                        else:
+                            rec.add_edge(u, v, type=e_type)
+                
+                self.agents = agents
+                self._next_node_id = max(self._next_node_id, len(label_to_id))
+                self._strip_templates.clear()
+                self._clear_canvas_cache()
+                self._rebuild_spatial_index()
+                self.redraw()
+            except Exception as e:
+                messagebox.showerror("Error", f"Failed to load: {e}")
 
     def _parse_node_attributes(self, combined_string):
         """Extracts (Type, Layer) from the legacy JSON combined string format."""
         n_type = "Resource"
-        layer = "Base Environment"
         
         if combined_string.endswith("Function"):
             n_type = "Function"
@@ -889,16 +1272,45 @@ class GraphBuilderApp:
         else:
             prefix = combined_string
             
-        norm_prefix = prefix.lower().replace(" ", "")
-        for known in config.LAYER_ORDER:
-            if known.lower().replace(" ", "") == norm_prefix:
-                layer = known
-                break
+        layer = config.LAYER_LOOKUP.get(prefix.lower().replace(" ", ""), "Base Environment")
         return n_type, layer
 
     def save_architecture_internal(self):
         n = simpledialog.askstring("Name", "Name:")
-        if n: self.saved_archs[n] = self.G.copy()
+        if not n: return
+        snapshot = self.G.copy()
+        
+        # Children of an overwritten architecture are re-diffed against its new contents
+        children = [c for c, (parent, _) in self.saved_archs.items() if parent == n]
+        child_graphs = {c: self._materialize_arch(c) for c in children}
+        
+        parent = self._last_arch if self._last_arch in self.saved_archs and self._last_arch != n else None
+        if parent is not None and n in self._arch_chain(parent):
+            parent = None  # Would make n its own ancestor
+        self.saved_archs[n] = (parent, diff_graphs(self._materialize_arch(parent), snapshot)) if parent else (None, snapshot)
+        self._arch_stamps[n] = next(self._replay_stamps)
+        for c, g in child_graphs.items():
+            self.saved_archs[c] = (n, diff_graphs(snapshot, g))  # Same contents as before, so the stamp is kept
+        self._last_arch = n
+
+    def _arch_chain(self, name):
+        """Names from `name` back to its baseline architecture."""
+        chain = [name]
+        while self.saved_archs[chain[-1]][0] is not None:
+            chain.append(self.saved_archs[chain[-1]][0])
+        return chain
+
+    def _materialize_arch(self, name):
+        """Rebuilds a stored architecture by replaying its diff chain onto a copy of the baseline."""
+        chain = self._arch_chain(name)
+        G = self.saved_archs[chain[-1]][1].copy()
+        for link in reversed(chain[:-1]):
+            redo_ops(G, self.saved_archs[link][1])
+        # The baseline's version stamp does not describe the replayed graph. Replayed graphs are never
+        # edited, so one stable stamp per stored architecture lets every replay share its cached analytics
+        G.graph['version'] = ("arch", name, self._arch_stamps[name])
+        G.graph.pop('_derived', None)
+        return G
 
     def open_comparison_dialog(self):
         if not self.saved_archs: 
@@ -915,7 +1327,7 @@ class GraphBuilderApp:
 
         def go():
             selected = [lb.get(i) for i in lb.curselection()]
-            graphs = [(n, self.G.copy() if n == "Current" else self.saved_archs[n].copy()) for n in selected]
+            graphs = [(n, self.G.copy() if n == "Current" else self._materialize_arch(n)) for n in selected]
             w.destroy()
             self.launch_compare_window(graphs)
         tk.Button(w, text="Go", command=go).pack()
@@ -955,73 +1367,97 @@ class GraphBuilderApp:
                 else:
                     panel.set_highlights([])
 
-        def refresh_grid():
-            for child in top_frame.winfo_children(): 
-                if child != h_row: child.destroy()
-            
-            grid_f = tk.Frame(top_frame)
-            grid_f.pack(fill=tk.X, padx=10)
-            
-            tk.Label(grid_f, text="Metric", font=("Arial", 12, "bold"), width=18, relief="solid", bd=1, bg="#e0e0e0").grid(row=0, column=0, sticky="nsew")
-            for i, (name, _) in enumerate(graph_list):
-                tk.Label(grid_f, text=name, font=("Arial", 12, "bold"), width=15, relief="solid", bd=1, bg="#e0e0e0").grid(row=0, column=i+1, sticky="nsew")
-            
-            metrics = ["Nodes", "Edges", "Density", "Cyclomatic Number", "Total Cycles", "Avg Cycle Length", "Interdependence", "Modularity", "Global Efficiency"]
-            
-            for r, m in enumerate(metrics):
-                lbl = tk.Label(grid_f, text=m, font=("Arial", 12), relief="solid", bd=1, anchor="w", padx=5)
-                lbl.grid(row=r+1, column=0, sticky="nsew")
-                if m in ["Total Cycles", "Interdependence", "Modularity"]:
-                    lbl.config(fg="blue", cursor="hand2")
-                    lbl.bind("<Button-1>", lambda e, name=m: set_highlights(name))
+        # One Treeview holds the whole metric grid; rows are updated in place rather than rebuilt
+        metrics = ["Nodes", "Edges", "Density", "Cyclomatic Number", "Total Cycles", "Avg Cycle Length", "Interdependence", "Modularity", "Global Efficiency"]
+        clickable = ("Total Cycles", "Interdependence", "Modularity")
+        grid_cols = ["metric"] + [f"g{i}" for i in range(len(graph_list))]
+        
+        style = ttk.Style(w)
+        style.configure("Compare.Treeview", font=("Arial", 12), rowheight=24)
+        style.configure("Compare.Treeview.Heading", font=("Arial", 12, "bold"))
+        
+        grid_tree = ttk.Treeview(top_frame, columns=grid_cols, show="headings", height=len(metrics), style="Compare.Treeview", selectmode="none")
+        grid_tree.heading("metric", text="Metric", anchor="w")
+        grid_tree.column("metric", width=200, anchor="w", stretch=False)
+        for i, (name, _) in enumerate(graph_list):
+            grid_tree.heading(f"g{i}", text=name)
+            grid_tree.column(f"g{i}", width=150, anchor="center")
+        grid_tree.tag_configure("clickable", foreground="blue")
+        for m in metrics:
+            grid_tree.insert("", tk.END, iid=m, values=[m] + ["…"] * len(graph_list), tags=("clickable",) if m in clickable else ())
+        grid_tree.pack(fill=tk.X, padx=10)
+        
+        def on_grid_click(event):
+            row = grid_tree.identify_row(event.y)
+            if row in clickable and grid_tree.identify_column(event.x) == "#1":
+                set_highlights(row)
+        grid_tree.bind("<Button-1>", on_grid_click)
+
+        # Compared graphs are frozen copies: each column is computed once, on the worker pool, so
+        # the window opens at once and columns run side by side (in parallel when igraph releases the GIL)
+        def fill_column(col, values):
+            for m in metrics:
+                try: grid_tree.set(m, f"g{col}", str(values[m]))
+                except tk.TclError: return  # Window closed meanwhile
 
-                for c, (_, g) in enumerate(graph_list):
-                    val = calculate_metric(g, m)
-                    tk.Label(grid_f, text=str(val), font=("Arial", 12), relief="solid", bd=1).grid(row=r+1, column=c+1, sticky="nsew")
+        def refresh_grid():
+            for c, (_, g) in enumerate(graph_list):
+                fut = self._metric_pool.submit(calculate_metrics, g, metrics)
+                if fut.done():
+                    fill_column(c, fut.result())
+                else:
+                    fut.add_done_callback(lambda f, c=c: self.root.after(0, fill_column, c, f.result()))
+
+        # Centralities are computed on the worker pool, once per compared graph
+        centrality_futures = {}
+        inspected = [None]  # Label currently shown in the inspector; stale results are dropped
+        def fill_centralities(row, node_label, scores, target_id):
+            if inspected[0] != node_label: return
+            for col, key in (("deg_c", "degree"), ("betw", "betweenness"), ("eig", "eigenvector")):
+                s = scores[key]
+                try: node_tree.set(row, col, f"{s[target_id]:.3f}" if s and target_id in s else "0.000")
+                except tk.TclError: return  # Window closed meanwhile
+
+        label_indices = []
+        for _, g in graph_list:
+            index = {}
+            for n, d in g.nodes(data=True):
+                index.setdefault(d.get('label'), n)
+            label_indices.append(index)
+
+        # Inspector table is built once; clicking a node only rewrites its row values
+        inspector_title = tk.Label(inspector_frame, text="Node Inspector", font=("Arial", 16, "bold"), bg="#f0f0f0")
+        inspector_title.pack(pady=5, anchor="w", padx=10)
+        
+        node_cols = [("arch", "Architecture"), ("in_deg", "In-Degree"), ("out_deg", "Out-Degree"), ("deg_c", "Degree Centrality"), ("betw", "Betweenness"), ("eig", "Eigenvector")]
+        node_tree = ttk.Treeview(inspector_frame, columns=[c for c, _ in node_cols], show="headings", height=len(graph_list), style="Compare.Treeview", selectmode="none")
+        for col, text in node_cols:
+            node_tree.heading(col, text=text, anchor="w" if col == "arch" else "center")
+            node_tree.column(col, width=170, anchor="w" if col == "arch" else "center")
+        for row, (g_name, _) in enumerate(graph_list):
+            node_tree.insert("", tk.END, iid=str(row), values=[g_name] + [""] * (len(node_cols) - 1))
+        node_tree.pack(fill=tk.X, padx=10, pady=5)
 
         def on_node_clicked(node_label):
-            for child in inspector_frame.winfo_children():
-                child.destroy()
-                
-            tk.Label(inspector_frame, text=f"Node Inspector: '{node_label}'", font=("Arial", 16, "bold"), bg="#f0f0f0").pack(pady=5, anchor="w", padx=10)
-            
-            table_f = tk.Frame(inspector_frame, bg="white", bd=1, relief="solid")
-            table_f.pack(fill=tk.X, padx=10, pady=5)
-            
-            node_metrics = ["In-Degree", "Out-Degree", "Degree Centrality", "Betweenness", "Eigenvector"]
-            
-            tk.Label(table_f, text="Architecture", font=("Arial", 14, "bold"), relief="solid", bd=1, bg="#e0e0e0", width=15).grid(row=0, column=0, sticky="nsew")
-            for col, m in enumerate(node_metrics):
-                tk.Label(table_f, text=m, font=("Arial", 14, "bold"), relief="solid", bd=1, bg="#e0e0e0", width=16).grid(row=0, column=col+1, sticky="nsew")
+            inspected[0] = node_label
+            inspector_title.config(text=f"Node Inspector: '{node_label}'")
             
             for row, (g_name, g) in enumerate(graph_list):
-                tk.Label(table_f, text=g_name, font=("Arial", 13, "bold"), relief="solid", bd=1, anchor="w", padx=5).grid(row=row+1, column=0, sticky="nsew")
-                
-                target_id = None
-                for n, d in g.nodes(data=True):
-                    if d.get('label') == node_label:
-                        target_id = n
-                        break
-                
+                iid = str(row)
+                target_id = label_indices[row].get(node_label)
                 if target_id is None:
-                    for col in range(len(node_metrics)):
-                        tk.Label(table_f, text="-", font=("Arial", 13), relief="solid", bd=1).grid(row=row+1, column=col+1, sticky="nsew")
+                    node_tree.item(iid, values=[g_name] + ["-"] * (len(node_cols) - 1))
                     continue
                 
-                def safe_m(func, **kwargs):
-                    try: return f"{func(g, **kwargs)[target_id]:.3f}"
-                    except: return "0.000"
-
-                vals = [
-                    str(g.in_degree(target_id)),
-                    str(g.out_degree(target_id)),
-                    safe_m(nx.degree_centrality),
-                    safe_m(nx.betweenness_centrality),
-                    safe_m(nx.eigenvector_centrality, max_iter=100, tol=1e-04)
-                ]
+                node_tree.item(iid, values=[g_name, str(g.in_degree(target_id)), str(g.out_degree(target_id)), "…", "…", "…"])
                 
-                for col, val in enumerate(vals):
-                    tk.Label(table_f, text=val, font=("Arial", 13), relief="solid", bd=1).grid(row=row+1, column=col+1, sticky="nsew")
+                if row not in centrality_futures:
+                    centrality_futures[row] = self._metric_pool.submit(_centrality_scores, g)
+                fut = centrality_futures[row]
+                if fut.done():
+                    fill_centralities(iid, node_label, fut.result(), target_id)
+                else:
+                    fut.add_done_callback(lambda f, r=iid, l=node_label, t=target_id: self.root.after(0, fill_centralities, r, l, f.result(), t))
 
         for name, g in graph_list:
             p = InteractiveComparisonPanel(graph_container, g, name, config.NODE_RADIUS, self.agents, None, on_node_clicked)
@@ -1051,20 +1487,18 @@ class GraphBuilderApp:
         self.root.unbind("<ButtonRelease-1>")
 
         if self.sidebar_drag_data:
-            mx, my = event.x_root, event.y_root
+            # One Tk query for the widget under the pointer, then walk up to its agent frame
+            frame_agents = {frame: name for name, frame in self.agent_ui_frames.items()}
             target_agent = None
-
-            for name, frame in self.agent_ui_frames.items():
-                fx, fy = frame.winfo_rootx(), frame.winfo_rooty()
-                fw, fh = frame.winfo_width(), frame.winfo_height()
-                
-                if fx <= mx <= fx + fw and fy <= my <= fy + fh:
-                    target_agent = name
-                    break
+            try: widget = self.root.winfo_containing(event.x_root, event.y_root)
+            except KeyError: widget = None  # Tk-internal widget with no Python wrapper
+            while widget is not None and target_agent is None:
+                target_agent = frame_agents.get(widget)
+                widget = widget.master
             
             if target_agent:
-                self.save_state()
-                self.G.nodes[self.sidebar_drag_data]['agent'] = [target_agent]
+                with self._record() as rec:
+                    rec.set_node_attr(self.sidebar_drag_data, 'agent', [target_agent])
                 
             self.sidebar_drag_data = None
 
@@ -1072,22 +1506,29 @@ class GraphBuilderApp:
 
     def find_edge_at(self, x, y):
         """Utility for hit-testing edges for selection or deletion."""
-        threshold = 8 
+        # Tested in world space: the click is transformed once instead of every endpoint
+        wx, wy = self.to_world(x, y)
+        threshold = 8 / self.zoom
+        t2 = threshold * threshold
+        world = self._world_positions()
         for u, v in self.G.edges():
-            wx1, wy1 = self.get_draw_pos(u)
-            wx2, wy2 = self.get_draw_pos(v)
-            sx1, sy1 = self.to_screen(wx1, wy1)
-            sx2, sy2 = self.to_screen(wx2, wy2)
+            x1, y1 = world[u]
+            x2, y2 = world[v]
             
-            dx, dy = sx2 - sx1, sy2 - sy1
+            # Cheap bounding-box reject before the segment projection
+            if (wx < min(x1, x2) - threshold or wx > max(x1, x2) + threshold or
+                    wy < min(y1, y2) - threshold or wy > max(y1, y2) + threshold):
+                continue
+            
+            dx, dy = x2 - x1, y2 - y1
             if dx == 0 and dy == 0: 
-                dist = math.hypot(x - sx1, y - sy1)
+                d2 = (wx - x1) ** 2 + (wy - y1) ** 2
             else:
-                t = ((x - sx1) * dx + (y - sy1) * dy) / (dx*dx + dy*dy)
+                t = ((wx - x1) * dx + (wy - y1) * dy) / (dx*dx + dy*dy)
                 t = max(0, min(1, t))
-                dist = math.hypot(x - (sx1 + t * dx), y - (sy1 + t * dy))
+                d2 = (wx - (x1 + t * dx)) ** 2 + (wy - (y1 + t * dy)) ** 2
             
-            if dist < threshold: return (u, v)
+            if d2 < t2: return (u, v)
         return None
 
     def trigger_visual_analytics(self, mode):
@@ -1096,27 +1537,27 @@ class GraphBuilderApp:
             self.active_vis_mode = None
         else:
             self.active_vis_mode = mode
-            if mode == "cycles":
-                self.current_highlights = metric_visualizations.get_cycle_highlights(self.G)
-            elif mode == "interdependence":
-                self.current_highlights = metric_visualizations.get_interdependence_highlights(self.G)
-            elif mode == "modularity":
-                self.current_highlights = metric_visualizations.get_modularity_highlights(self.G)
+            getter = {
+                "cycles": metric_visualizations.get_cycle_highlights,
+                "interdependence": metric_visualizations.get_interdependence_highlights,
+                "modularity": metric_visualizations.get_modularity_highlights,
+            }.get(mode)
+            if getter:
+                # Memoized per graph version: toggling a view on an unchanged graph reuses the result
+                self.current_highlights = self._cached(("highlights", mode), lambda: getter(self.G))
         self.redraw()
     
     def trigger_single_cycle_vis(self, index, graph_source=None):
-        target = graph_source if graph_source else self.G
-        hl = metric_visualizations.get_single_cycle_highlight(target, index)
-        if graph_source: return hl
+        if graph_source: return metric_visualizations.get_single_cycle_highlight(graph_source, index)
+        hl = self._cached(("highlights", "cycle", index), lambda: metric_visualizations.get_single_cycle_highlight(self.G, index))
         
         self.current_highlights = hl
         self.active_vis_mode = f"cycle_{index}"
         self.redraw()
 
     def trigger_single_modularity_vis(self, index, graph_source=None):
-        target = graph_source if graph_source else self.G
-        hl = metric_visualizations.get_single_modularity_highlight(target, index)
-        if graph_source: return hl
+        if graph_source: return metric_visualizations.get_single_modularity_highlight(graph_source, index)
+        hl = self._cached(("highlights", "mod_group", index), lambda: metric_visualizations.get_single_modularity_highlight(self.G, index))
         
         self.current_highlights = hl
         self.active_vis_mode = f"mod_group_{index}"
@@ -1140,20 +1581,19 @@ class GraphBuilderApp:
         frame.pack(fill=tk.BOTH, expand=True, padx=10)
 
         current_agents = self.G.nodes[node_id].get('agent', ["Unassigned"])
-        if not isinstance(current_agents, list): current_agents = [current_agents]
 
-        check_vars = {}
-        for agent_name in self.agents.keys():
-            var = tk.BooleanVar(value=(agent_name in current_agents))
-            check_vars[agent_name] = var
-            cb = tk.Checkbutton(frame, text=agent_name, variable=var, anchor="w", font=("Arial", 10))
-            cb.pack(fill=tk.X, pady=2)
+        # A single multi-select list scales to large agent rosters (one widget, not one per agent)
+        lb = tk.Listbox(frame, selectmode=tk.MULTIPLE, exportselection=False, font=("Arial", 10))
+        lb.pack(fill=tk.BOTH, expand=True)
+        for i, agent_name in enumerate(self.agents):
+            lb.insert(tk.END, agent_name)
+            if agent_name in current_agents: lb.selection_set(i)
 
         def save_shares():
-            selected = [name for name, var in check_vars.items() if var.get()]
+            selected = [lb.get(i) for i in lb.curselection()]
             if not selected: selected = ["Unassigned"]
-            self.save_state()
-            self.G.nodes[node_id]['agent'] = selected
+            with self._record() as rec:
+                rec.set_node_attr(node_id, 'agent', selected)
             self.redraw()
             win.destroy()
 
@@ -71,6 +71,13 @@ class InteractiveComparisonPanel:
         self.canvas.delete("all")
         r = self.node_radius * self.zoom 
         
+        # Screen position of every node, transformed once per pass and shared by all layers below
+        zoom, ox, oy = self.zoom, self.offset_x, self.offset_y
+        pos = {}
+        for n, d in self.G.nodes(data=True):
+            wx, wy = d.get('pos', (0,0))
+            pos[n] = (wx * zoom + ox, wy * zoom + oy)
+        
         # 1. Highlights (Cycles, Modularity, etc.)
         if self.highlights:
             edge_counts = {}
@@ -79,8 +86,7 @@ class InteractiveComparisonPanel:
                 width = h.get('width', 8) * self.zoom
                 
                 for n in h.get('nodes', []):
-                    wx, wy = self.G.nodes[n].get('pos', (0,0))
-                    sx, sy = self.to_screen(wx, wy)
+                    sx, sy = pos[n]
                     self.canvas.create_oval(sx-(r+width/2), sy-(r+width/2), 
                                           sx+(r+width/2), sy+(r+width/2), fill=color, outline=color)
 
@@ -89,9 +95,8 @@ class InteractiveComparisonPanel:
                     count = edge_counts.get(edge_key, 0)
                     edge_counts[edge_key] = count + 1
                     
-                    p1, p2 = self.G.nodes[u].get('pos', (0,0)), self.G.nodes[v].get('pos', (0,0))
-                    sx1, sy1 = self.to_screen(p1[0], p1[1])
-                    sx2, sy2 = self.to_screen(p2[0], p2[1])
+                    sx1, sy1 = pos[u]
+                    sx2, sy2 = pos[v]
                     
                     dx, dy = sx2 - sx1, sy2 - sy1
                     length = math.hypot(dx, dy)
@@ -105,19 +110,15 @@ class InteractiveComparisonPanel:
 
         # 2. Standard Edges
         for u, v in self.G.edges():
-            p1, p2 = self.G.nodes[u].get('pos', (0,0)), self.G.nodes[v].get('pos', (0,0))
-            sx1, sy1 = self.to_screen(p1[0], p1[1])
-            sx2, sy2 = self.to_screen(p2[0], p2[1])
-            self.canvas.create_line(sx1, sy1, sx2, sy2, arrow=tk.LAST, width=2*self.zoom)
+            self.canvas.create_line(*pos[u], *pos[v], arrow=tk.LAST, width=2*zoom)
 
         # 3. Standard Nodes
+        font = ("Arial", max(15, int(10 * zoom)), "bold")
         for n, d in self.G.nodes(data=True):
-            wx, wy = d.get('pos', (0,0))
-            sx, sy = self.to_screen(wx, wy)
+            sx, sy = pos[n]
             
             # Shared Authority Rendering logic
             ag_list = d.get('agent', ["Unassigned"])
-            if not isinstance(ag_list, list): ag_list = [ag_list]
 
             if d.get('type') == "Function":
                 self._draw_split_rect(sx, sy, r, ag_list)
@@ -125,8 +126,7 @@ class InteractiveComparisonPanel:
                 self._draw_split_circle(sx, sy, r, ag_list)
             
             lbl = d.get('label', '')
-            font_size = max(15, int(10 * self.zoom))
-            self.canvas.create_text(sx, sy-(r + 5*self.zoom), text=lbl, font=("Arial", font_size, "bold"), anchor="s")
+            self.canvas.create_text(sx, sy-(r + 5*zoom), text=lbl, font=font, anchor="s")
 
     def _draw_split_rect(self, sx, sy, r, agents):
         strip_w = (r * 2) / len(agents)
@@ -183,7 +183,7 @@ class InteractiveComparisonPanel:
         self.drag_mode = self.drag_data = None
 
 class CreateToolTip:
-    """Standard hovering tooltip for UI elements."""
+    """Standard hovering tooltip for UI elements. `text` may be a callable, evaluated on each hover."""
     def __init__(self, widget, text='info'):
         self.widget = widget
         self.text = text
@@ -192,13 +192,14 @@ class CreateToolTip:
         self.widget.bind("<Leave>", self.hidetip)
 
     def showtip(self, event=None):
-        if not self.text: return
+        text = self.text() if callable(self.text) else self.text
+        if not text: return
         x = self.widget.winfo_rootx() + 25
         y = self.widget.winfo_rooty() + 20
         self.tw = tk.Toplevel(self.widget)
         self.tw.wm_overrideredirect(True)
         self.tw.wm_geometry(f"+{x}+{y}")
-        tk.Label(self.tw, text=self.text, justify='left', background="#ffffe0", 
+        tk.Label(self.tw, text=text, justify='left', background="#ffffe0", 
                  relief='solid', borderwidth=1, font=("tahoma", "8")).pack(ipadx=1)
 
     def hidetip(self, event=None):
@@ -4,6 +4,12 @@
 # --- Graph Geometry & History ---
 NODE_RADIUS = 20
 HISTORY_LIMIT = 40
+SPATIAL_CELL_SIZE = NODE_RADIUS * 2  # World-space bucket size for node hit-testing
+VIEWPORT_MARGIN = 20  # Extra screen pixels drawn beyond the visible canvas edge
+MAX_CYCLES = 1000  # Cap on enumerated feedback loops; counts beyond this display as "1000+"
+ANALYTICS_CACHE_SIZE = 16  # Memoized (graph, analytic) results kept in memory (cycles, communities, efficiency)
+LOUVAIN_SEED = 42  # Makes community detection repeatable for a given graph
+ANALYTICS_ENGINE = "auto"  # "auto" uses igraph for communities/efficiency when installed; "networkx" never does
 
 # --- Agent Defaults ---
 DEFAULT_AGENTS = {"Unassigned": "white"}
@@ -30,6 +36,12 @@ LAYER_ORDER = [
     "Base Environment"
 ]
 
+# (name, world_y) pairs in render order, resolved once at import
+LAYER_GUIDES = [(name, JSAT_LAYERS[name]) for name in LAYER_ORDER]
+
+# Layer names keyed by their lowercase, space-free form (as written in legacy JSON type strings)
+LAYER_LOOKUP = {name.lower().replace(" ", ""): name for name in LAYER_ORDER}
+
 # --- Edge Logic & Styling ---
 EDGE_TYPE_HARD = "hard"
 EDGE_TYPE_SOFT = "soft"
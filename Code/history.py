@@ -0,0 +1,140 @@
+# history.py
+# Undo/redo journal: each edit is stored as the list of primitive graph operations it performed
+from dataclasses import dataclass, field
+
+_ABSENT = object()  # Marks an attribute that did not exist before (or after) a change
+_UNSET = object()  # Default for optional arguments that may legitimately be _ABSENT
+
+def _set_or_drop(attrs, key, value):
+    if value is _ABSENT: attrs.pop(key, None)
+    else: attrs[key] = value
+
+@dataclass
+class NodeAdd:
+    nid: object
+    attrs: dict
+
+    def apply(self, G): G.add_node(self.nid, **self.attrs)
+    def revert(self, G): G.remove_node(self.nid)
+
+@dataclass
+class NodeDel:
+    """Incident edges are journaled as separate EdgeDel ops ahead of this one."""
+    nid: object
+    attrs: dict
+
+    def apply(self, G): G.remove_node(self.nid)
+    def revert(self, G): G.add_node(self.nid, **self.attrs)
+
+@dataclass
+class NodeAttrChange:
+    nid: object
+    key: str
+    old: object
+    new: object
+
+    def apply(self, G): _set_or_drop(G.nodes[self.nid], self.key, self.new)
+    def revert(self, G): _set_or_drop(G.nodes[self.nid], self.key, self.old)
+
+@dataclass
+class EdgeAdd:
+    u: object
+    v: object
+    attrs: dict
+
+    def apply(self, G): G.add_edge(self.u, self.v, **self.attrs)
+    def revert(self, G): G.remove_edge(self.u, self.v)
+
+@dataclass
+class EdgeDel:
+    u: object
+    v: object
+    attrs: dict
+
+    def apply(self, G): G.remove_edge(self.u, self.v)
+    def revert(self, G): G.add_edge(self.u, self.v, **self.attrs)
+
+@dataclass
+class EdgeTypeChange:
+    u: object
+    v: object
+    old: object
+    new: object
+
+    def apply(self, G): _set_or_drop(G.edges[self.u, self.v], 'type', self.new)
+    def revert(self, G): _set_or_drop(G.edges[self.u, self.v], 'type', self.old)
+
+@dataclass
+class HistoryRecorder:
+    """
+    Performs graph mutations and journals each one. Attribute values are replaced, never
+    edited in place, so the old values kept in the journal stay valid.
+    """
+    G: object
+    ops: list = field(default_factory=list)
+
+    def _do(self, op):
+        op.apply(self.G)
+        self.ops.append(op)
+
+    def add_node(self, nid, **attrs):
+        self._do(NodeAdd(nid, attrs))
+
+    def remove_node(self, nid):
+        for u, v in list(self.G.in_edges(nid)) + list(self.G.out_edges(nid)):
+            if self.G.has_edge(u, v): self.remove_edge(u, v)  # self-loops appear in both lists
+        self._do(NodeDel(nid, dict(self.G.nodes[nid])))
+
+    def set_node_attr(self, nid, key, value, old=_UNSET):
+        """Sets a node attribute. Pass `old` when the live value was already changed (e.g., mid-drag)."""
+        if old is _UNSET: old = self.G.nodes[nid].get(key, _ABSENT)
+        self._do(NodeAttrChange(nid, key, old, value))
+
+    def add_edge(self, u, v, **attrs):
+        self._do(EdgeAdd(u, v, attrs))
+
+    def remove_edge(self, u, v):
+        self._do(EdgeDel(u, v, dict(self.G.edges[u, v])))
+
+    def set_edge_type(self, u, v, new_type):
+        self._do(EdgeTypeChange(u, v, self.G.edges[u, v].get('type', _ABSENT), new_type))
+
+    def clear(self):
+        # Removed back to front so that undo re-adds nodes in their original order
+        for n in reversed(list(self.G.nodes)): self.remove_node(n)
+
+def diff_graphs(old, new):
+    """Returns the ops that turn graph `old` into graph `new` when replayed with redo_ops."""
+    ops = []
+    changed_edges = []
+    for u, v, d in old.edges(data=True):
+        if not new.has_edge(u, v): ops.append(EdgeDel(u, v, dict(d)))
+        else:
+            nd = new.edges[u, v]
+            if nd != d: changed_edges.append((u, v, d, nd))
+    for u, v, d, nd in changed_edges:
+        if d.keys() - {'type'} == nd.keys() - {'type'} and all(d[k] == nd[k] for k in d.keys() - {'type'}):
+            ops.append(EdgeTypeChange(u, v, d.get('type', _ABSENT), nd.get('type', _ABSENT)))
+        else:
+            ops.extend((EdgeDel(u, v, dict(d)), EdgeAdd(u, v, dict(nd))))
+    
+    for n, d in old.nodes(data=True):
+        if n not in new: ops.append(NodeDel(n, dict(d)))
+    for n, nd in new.nodes(data=True):
+        if n not in old:
+            ops.append(NodeAdd(n, dict(nd)))
+            continue
+        d = old.nodes[n]
+        for key in d.keys() | nd.keys():
+            if d.get(key, _ABSENT) != nd.get(key, _ABSENT):
+                ops.append(NodeAttrChange(n, key, d.get(key, _ABSENT), nd.get(key, _ABSENT)))
+    
+    for u, v, nd in new.edges(data=True):
+        if not old.has_edge(u, v): ops.append(EdgeAdd(u, v, dict(nd)))
+    return ops
+
+def undo_ops(G, ops):
+    for op in reversed(ops): op.revert(G)
+
+def redo_ops(G, ops):
+    for op in ops: op.apply(G)
@@ -1,6 +1,21 @@
 # metric_visualizations.py
-import networkx as nx
-import random
+from itertools import chain
+from utils import cross_agent_edges, find_cycles, find_communities, has_any_cycle
+
+# High-contrast palette for visual clarity against white canvas
+NEON_COLORS = (
+    "#FF1493", "#00FF00", "#00FFFF", "#FFD700", 
+    "#FF4500", "#9400D3", "#32CD32", "#1E90FF"
+)
+# Variant used when a single cycle is picked from the dashboard list
+SINGLE_CYCLE_COLORS = (
+    "#FF1493", "#00C000", "#DE52D0", "#FFD700", 
+    "#FF4500", "#9400D3", "#32CD32", "#060C12"
+)
+COMMUNITY_COLORS = (
+    "#FF6B6B", "#4ECDC4", "#45B7D1", "#FFA07A", 
+    "#98D8C8", "#F7DC6F", "#BB8FCE", "#B2BABB"
+)
 
 def get_cycle_highlights(G):
     """
@@ -8,25 +23,17 @@ def get_cycle_highlights(G):
     Useful for visualizing feedback loops and potential resonance in the system.
     """
     try:
-        cycles = list(nx.simple_cycles(G))
+        if not has_any_cycle(G): return []
+        cycles, _ = find_cycles(G)
     except (ImportError, AttributeError):
         return []
 
     highlights = []
-    # High-contrast palette for visual clarity against white canvas
-    neon_colors = [
-        "#FF1493", "#00FF00", "#00FFFF", "#FFD700", 
-        "#FF4500", "#9400D3", "#32CD32", "#1E90FF"
-    ]
 
     for i, path in enumerate(cycles):
-        color = neon_colors[i % len(neon_colors)]
+        color = NEON_COLORS[i % len(NEON_COLORS)]
         
-        cycle_edges = []
-        for j in range(len(path)):
-            u = path[j]
-            v = path[(j + 1) % len(path)]
-            cycle_edges.append((u, v))
+        cycle_edges = list(zip(path, chain(path[1:], path[:1])))
             
         highlights.append({
             "nodes": path,
@@ -38,20 +45,15 @@ def get_cycle_highlights(G):
     return highlights
 
 def get_single_cycle_highlight(G, cycle_index):
-    """Highlights a specific cycle by index from the simple_cycles list."""
+    """Highlights a specific cycle by index in the find_cycles list (the order shown on the dashboard)."""
     try:
-        cycles = list(nx.simple_cycles(G))
+        cycles, _ = find_cycles(G)
         if cycle_index < 0 or cycle_index >= len(cycles):
             return [] 
             
         path = cycles[cycle_index]
-        neon_colors = [
-            "#FF1493", "#00C000", "#DE52D0", "#FFD700", 
-            "#FF4500", "#9400D3", "#32CD32", "#060C12"
-        ]
-        
-        color = neon_colors[cycle_index % len(neon_colors)]
-        cycle_edges = [(path[j], path[(j + 1) % len(path)]) for j in range(len(path))]
+        color = SINGLE_CYCLE_COLORS[cycle_index % len(SINGLE_CYCLE_COLORS)]
+        cycle_edges = list(zip(path, chain(path[1:], path[:1])))
             
         return [{
             "nodes": path,
@@ -68,20 +70,10 @@ def get_interdependence_highlights(G):
     Identifies 'Cross-Agent' edges that drive system interdependence.
     Highlights connections where Source and Target agents differ.
     """
-    cross_edges = []
-    involved_nodes = set()
-    
-    for u, v in G.edges():
-        agent_u = G.nodes[u].get('agent', 'Unassigned')
-        agent_v = G.nodes[v].get('agent', 'Unassigned')
-        
-        if agent_u != agent_v:
-            cross_edges.append((u, v))
-            involved_nodes.add(u)
-            involved_nodes.add(v)
-            
+    cross_edges = cross_agent_edges(G)
     if not cross_edges:
         return []
+    involved_nodes = set(chain.from_iterable(cross_edges))
 
     return [{
         "nodes": list(involved_nodes),
@@ -90,26 +82,26 @@ def get_interdependence_highlights(G):
         "width": 8
     }]
 
+def _intra_edges(G, nodes):
+    """Edges with both ends in `nodes`, found by walking each member's successors (O(sum of degrees), not O(|C|^2))."""
+    members = set(nodes)
+    succ = G.succ if G.is_directed() else G.adj
+    return [(u, v) for u in nodes for v in succ[u] if v in members]
+
 def get_modularity_highlights(G):
     """
-    Detects communities using greedy modularity and assigns unique colors.
+    Detects communities (Louvain modularity) and assigns unique colors.
     Visualizes tightly coupled functional groups within the broader network.
     """
     try:
-        communities = nx.community.greedy_modularity_communities(G.to_undirected())
+        communities, _ = find_communities(G)
         highlights = []
-        community_colors = [
-            "#FF6B6B", "#4ECDC4", "#45B7D1", "#FFA07A", 
-            "#98D8C8", "#F7DC6F", "#BB8FCE", "#B2BABB"
-        ]
 
         for i, community_set in enumerate(communities):
-            color = community_colors[i % len(community_colors)]
+            color = COMMUNITY_COLORS[i % len(COMMUNITY_COLORS)]
             nodes_list = list(community_set)
             
-            intra_edges = [
-                (u, v) for u in nodes_list for v in nodes_list if G.has_edge(u, v)
-            ]
+            intra_edges = _intra_edges(G, nodes_list)
             
             highlights.append({
                 "nodes": nodes_list,
@@ -123,24 +115,17 @@ def get_modularity_highlights(G):
         return []
     
 def get_single_modularity_highlight(G, group_index):
-    """Highlights a specific community detected via modularity analysis."""
+    """Highlights a specific community by index in the size-sorted find_communities list (the dashboard order)."""
     try:
-        communities = list(nx.community.greedy_modularity_communities(G.to_undirected()))
-        communities.sort(key=len, reverse=True)
+        communities, _ = find_communities(G)
         
         if group_index < 0 or group_index >= len(communities):
             return []
             
         target_group = list(communities[group_index])
-        community_colors = [
-            "#FF6B6B", "#4ECDC4", "#45B7D1", "#FFA07A", 
-            "#98D8C8", "#F7DC6F", "#BB8FCE", "#B2BABB"
-        ]
-        color = community_colors[group_index % len(community_colors)]
+        color = COMMUNITY_COLORS[group_index % len(COMMUNITY_COLORS)]
         
-        intra_edges = [
-            (u, v) for u in target_group for v in target_group if G.has_edge(u, v)
-        ]
+        intra_edges = _intra_edges(G, target_group)
                     
         return [{
             "nodes": target_group,
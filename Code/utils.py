@@ -1,139 +1,330 @@
 # utils.py
+import itertools
+from collections import Counter
+from operator import itemgetter
+import threading
 import networkx as nx
 import config
 
-def calculate_metric(G, metric_name):
+try:
+    import igraph  # Optional: C implementations of community detection and shortest paths
+except ImportError:
+    igraph = None
+
+# Expensive structural analytics (cycles, communities, efficiency) shared by the dashboard, the highlight functions and the
+# comparison window. Guarded by a lock because the dashboard computes them on a worker thread.
+_analytics_cache = {}
+_analytics_lock = threading.Lock()
+_MISS = object()
+
+def graph_signature(G):
+    """Cheap fingerprint of a graph's structure; includes the editor's version counter when set."""
+    return (G.graph.get('version'), G.number_of_nodes(), G.number_of_edges(), hash(frozenset(G.edges())))
+
+def has_any_cycle(G):
+    """Linear-time existence check (self-loops count); lets callers skip full enumeration on acyclic graphs."""
+    return not nx.is_directed_acyclic_graph(G)
+
+def _memoized(G, key, compute):
+    """Returns compute() for this graph signature and key, reusing an earlier result when possible."""
+    key = (graph_signature(G),) + key
+    with _analytics_lock:
+        hit = _analytics_cache.get(key, _MISS)
+    if hit is not _MISS: return hit
+    
+    value = compute()
+    with _analytics_lock:
+        _analytics_cache[key] = value
+        while len(_analytics_cache) > config.ANALYTICS_CACHE_SIZE:
+            del _analytics_cache[next(iter(_analytics_cache))]  # Oldest entry first
+    return value
+
+def find_cycles(G, limit=config.MAX_CYCLES):
+    """
+    Enumerates simple cycles one strongly connected component at a time, stopping after
+    `limit`. Returns (cycles, truncated). Trivial SCCs are skipped unless they carry a self-loop.
+    Results are memoized per graph signature.
+    """
+    def per_component():
+        for comp in nx.strongly_connected_components(G):
+            if len(comp) > 1:
+                yield from nx.simple_cycles(G.subgraph(comp))
+            else:
+                n = next(iter(comp))
+                if G.has_edge(n, n): yield [n]
+
+    def enumerate_cycles():
+        cycles = list(itertools.islice(per_component(), limit + 1))
+        return cycles[:limit], len(cycles) > limit
+
+    cycles, truncated = _memoized(G, ("cycles", limit), enumerate_cycles)
+    return list(cycles), truncated
+
+def _use_igraph():
+    return igraph is not None and config.ANALYTICS_ENGINE != "networkx"
+
+def _to_igraph(H):
+    """Converts an undirected NetworkX graph, isolated nodes included. Returns (igraph graph, node ids by vertex index)."""
+    nodes = list(H)
+    index = {n: i for i, n in enumerate(nodes)}
+    g = igraph.Graph(n=len(nodes), edges=[(index[u], index[v]) for u, v in H.edges()], directed=False)
+    return g, nodes
+
+def find_communities(G):
+    """
+    Modularity communities of the undirected view, largest first, with their Q score.
+    Louvain either way: igraph's multilevel method when available, NetworkX's otherwise.
+    Returns (communities, q). Memoized per graph signature and node set; raises if detection fails.
+    """
+    def detect():
+        # Closed forms: with no edges every node is its own group (modularity is undefined, shown as 0);
+        # a lone node is one group with Q = 0
+        if G.number_of_edges() == 0: return [frozenset((n,)) for n in G], 0.0
+        if G.number_of_nodes() == 1: return [frozenset(G)], 0.0
+        
+        U = G.to_undirected(as_view=True)
+        if _use_igraph():
+            g, nodes = _to_igraph(U)
+            found = [frozenset(nodes[i] for i in members) for members in g.community_multilevel()]
+        else:
+            # Fixed seed: group numbering must not change between refreshes of the same graph
+            found = nx.community.louvain_communities(U, seed=config.LOUVAIN_SEED)
+        comms = sorted(found, key=len, reverse=True)
+        # Scored by NetworkX either way so Q means the same thing under both engines
+        return comms, nx.community.modularity(U, comms)
+
+    # Unlike cycles and efficiency, the partition names every node, so the node set is part of the key
+    comms, q = _memoized(G, ("communities", hash(frozenset(G))), detect)
+    return list(comms), q
+
+def _per_version(G, key, build):
+    """
+    Returns build() cached on the graph itself for as long as the editor's version stamp is
+    unchanged. Unversioned graphs (e.g., replayed architectures) rebuild on every call.
+    """
+    version = G.graph.get('version')
+    if version is None: return build()
+    stamp, derived = G.graph.get('_derived', (None, None))
+    if stamp != version:
+        derived = {}
+        G.graph['_derived'] = (version, derived)
+    if key not in derived: derived[key] = build()
+    return derived[key]
+
+def nodes_by_type(G):
+    """Maps node type -> node ids. Node types never change after creation."""
+    def build():
+        index = {}
+        for n, d in G.nodes(data=True):
+            index.setdefault(d.get('type'), []).append(n)
+        return index
+    return _per_version(G, "by_type", build)
+
+def function_authority(G):
+    """Real (non-Unassigned) agents of each Function node, as tuples. Shared by the agent metrics."""
+    def build():
+        nodes = G.nodes
+        return [tuple(a for a in nodes[n].get('agent', []) if a != "Unassigned") for n in nodes_by_type(G).get('Function', ())]
+    return _per_version(G, "function_authority", build)
+
+def _edge_scan(G):
+    """
+    One pass over the edges that feeds every edge-based metric: (type -> [(u, v), ...], cross-agent edges).
+    Each distinct agent assignment is interned to an int first, so the cross-agent test compares codes.
+    Cached per graph version.
+    """
+    def build():
+        codes = {}
+        code_of = {n: codes.setdefault(tuple(d.get('agent', ("Unassigned",))), len(codes)) for n, d in G.nodes(data=True)}
+        by_type, cross = {}, []
+        for u, v, t in G.edges(data='type'):
+            by_type.setdefault(t, []).append((u, v))
+            if code_of[u] != code_of[v]: cross.append((u, v))
+        return by_type, cross
+    return _per_version(G, "edge_scan", build)
+
+def cross_agent_edges(G):
+    """Edges whose endpoints have different agent assignments; shared by the Interdependence metric and its highlight."""
+    return _edge_scan(G)[1]
+
+def hard_graph(G):
+    """Undirected skeleton of G's hard (essential) edges over all of G's nodes. Treat as read-only."""
+    def build():
+        H = nx.Graph()
+        H.add_nodes_from(G)
+        H.add_edges_from(edges_by_type(G).get(config.EDGE_TYPE_HARD, []))
+        return H
+    return _per_version(G, "hard_graph", build)
+
+def edges_by_type(G):
+    """Edges grouped by their 'type' attribute: type -> [(u, v), ...]."""
+    return _edge_scan(G)[0]
+
+def _efficiency_of(H):
+    # Fewer than two nodes or no edges means no pairs can reach each other
+    n = H.number_of_nodes()
+    if n < 2 or H.number_of_edges() == 0: return 0.0
+    if _use_igraph():
+        g, _ = _to_igraph(H)
+        inv = sum(1 / d for row in g.distances() for d in row if 0 < d < float('inf'))
+        return inv / (n * (n - 1))
+    return nx.global_efficiency(H)
+
+def global_efficiency(G, UG=None):
+    """
+    Global efficiency of G's undirected form (all-pairs shortest paths). Depends on structure
+    only, so it is memoized per graph signature and also reused for unversioned copies.
+    """
+    return _memoized(G, ("efficiency",), lambda: _efficiency_of(UG if UG is not None else G.to_undirected(as_view=True)))
+
+def hard_efficiency(G):
+    """Global efficiency of the hard-edge skeleton, cached per graph version."""
+    return _per_version(G, "hard_efficiency", lambda: _efficiency_of(hard_graph(G)))
+
+def format_cycle_count(cycles, truncated):
+    return f"{len(cycles)}+" if truncated else str(len(cycles))
+
+def format_avg_cycle_length(cycles, truncated):
+    """Mean length of the enumerated cycles; marked approximate when enumeration stopped at the cap."""
+    avg = sum(map(len, cycles)) / len(cycles) if cycles else 0.0
+    return f"≈{avg:.2f}" if truncated else f"{avg:.2f}"
+
+def calculate_metrics(G, metric_names):
+    """Calculates several metrics for one graph, sharing a single undirected view between them."""
+    UG = G.to_undirected(as_view=True)
+    return {name: calculate_metric(G, name, UG) for name in metric_names}
+
+# --- Metric handlers ---
+# Closed-form stats take (G, n); the rest take (G, n, UG) and run under calculate_metric's error guard.
+
+def _density(G, n):
+    # Same as nx.density without the dispatch: m / (n(n-1)), doubled for undirected graphs
+    denom = n * (n - 1)
+    if denom == 0: return "0.000"
+    m = G.number_of_edges()
+    return f"{(m if G.is_directed() else 2 * m) / denom:.3f}"
+
+def _avg_degree(G, n):
+    # Every edge (self-loops included) adds one to its source's and one to its target's degree
+    return f"{(2 * G.number_of_edges() / n):.2f}"
+
+# --- Structural Complexity ---
+def _avg_cycle_length(G, n, UG):
+    if not has_any_cycle(G): return "0.0 (None)"
+    cycles, truncated = find_cycles(G)
+    if not cycles: return "0.0 (None)"
+    return format_avg_cycle_length(cycles, truncated)
+
+def _cyclomatic_number(G, n, UG):
+    # Fundamental complexity: E - N + P
+    return str(G.number_of_edges() - n + nx.number_weakly_connected_components(G))
+
+def _total_cycles(G, n, UG):
+    # Count capped at MAX_CYCLES for performance on dense graphs
+    if not has_any_cycle(G): return "0"
+    return format_cycle_count(*find_cycles(G))
+
+# --- Resilience & Connectivity ---
+def _global_efficiency(G, n, UG):
+    # System integration (potential for information flow)
+    return f"{global_efficiency(G, UG):.3f}"
+
+def _modularity(G, n, UG):
+    # Structural coupling (Q-Score)
+    communities, q_score = find_communities(G)
+    return f"Q={q_score:.2f} ({len(communities)} Grps)"
+
+def _brittleness_ratio(G, n, UG):
+    # Balance of Soft (Supportive) vs. Hard (Essential) interdependencies
+    by_type = edges_by_type(G)
+    soft = len(by_type.get(config.EDGE_TYPE_SOFT, ()))
+    hard = len(by_type.get(config.EDGE_TYPE_HARD, ()))
+    if hard == 0: return "Inf (No Hard Edges)"
+    return f"{(soft / hard):.2f} (S:{soft}/H:{hard})"
+
+def _supportive_gain(G, n, UG):
+    # Measures efficiency loss if soft/assistive links are removed
+    eff_total = global_efficiency(G, UG)
+    eff_hard = hard_efficiency(G)
+    return f"{(eff_total - eff_hard):.3f} (Tot: {eff_total:.2f})"
+
+def _critical_vulnerability(G, n, UG):
+    # Checks if the essential 'Hard' skeleton remains connected
+    # Weak components of the directed skeleton are the components of its undirected form
+    num_comps = nx.number_connected_components(hard_graph(G))
+    return "Robust (1 Comp)" if num_comps == 1 else f"Fractured ({num_comps} Comps)"
+
+# --- Shared Authority & Coordination ---
+def _interdependence(G, n, UG):
+    # Ratio of edges crossing agent boundaries
+    m = G.number_of_edges()
+    if m == 0: return "0.000"
+    return f"{(len(cross_agent_edges(G)) / m):.3f}"
+
+def _functional_redundancy(G, n, UG):
+    # Average number of agents assigned per Function (backup capacity)
+    authority = function_authority(G)
+    if not authority: return "0.0"
+    return f"{(sum(map(len, authority)) / len(authority)):.2f}"
+
+def _agent_criticality(G, n, UG):
+    # Identifies the agent with the most 'Sole Authority' functions
+    sole_counts = Counter(real[0] for real in function_authority(G) if len(real) == 1)
+    if not sole_counts: return "None (Robust)"
+    worst, count = max(sole_counts.items(), key=itemgetter(1))
+    return f"{worst} ({count} Sole)"
+
+def _collaboration_ratio(G, n, UG):
+    # Percent of functions involving joint activity (multiple agents)
+    sizes = [len(real) for real in function_authority(G) if real]
+    total = len(sizes)
+    shared = sum(1 for k in sizes if k > 1)
+    if total == 0: return "0.0%"
+    return f"{((shared / total) * 100):.1f}%"
+
+_CLOSED_FORM_METRICS = {
+    "Density": _density,
+    "Avg Degree": _avg_degree,
+}
+
+_METRIC_HANDLERS = {
+    "Avg Cycle Length": _avg_cycle_length,
+    "Cyclomatic Number": _cyclomatic_number,
+    "Total Cycles": _total_cycles,
+    "Global Efficiency": _global_efficiency,
+    "Modularity": _modularity,
+    "Brittleness Ratio": _brittleness_ratio,
+    "Supportive Gain": _supportive_gain,
+    "Critical Vulnerability": _critical_vulnerability,
+    "Interdependence": _interdependence,
+    "Functional Redundancy": _functional_redundancy,
+    "Agent Criticality": _agent_criticality,
+    "Collaboration Ratio": _collaboration_ratio,
+}
+
+def calculate_metric(G, metric_name, UG=None):
     """
     Core analytical engine for JSAT. Calculates structural and functional metrics
     based on Network Science and Cognitive Systems Engineering principles.
+    `UG` is an optional undirected view of G, shared when computing metrics in a batch.
     """
+    n = G.number_of_nodes()
+    
+    # --- Basic Graph Stats ---
+    if metric_name == "Nodes": return str(n)
+    if metric_name == "Edges": return str(G.number_of_edges())
+    if n == 0: return "0"
+    
+    # Closed-form stats cannot raise, so they are answered outside the guard below
+    handler = _CLOSED_FORM_METRICS.get(metric_name)
+    if handler: return handler(G, n)
+    
+    handler = _METRIC_HANDLERS.get(metric_name)
+    if handler is None: return ""
+    # These call into NetworkX or read node data, either of which can raise
     try:
-        n = G.number_of_nodes()
-        
-        # --- Basic Graph Stats ---
-        if metric_name == "Nodes": return str(n)
-        if metric_name == "Edges": return str(G.number_of_edges())
-        if n == 0: return "0"
-        
-        if metric_name == "Density": 
-            return f"{nx.density(G):.3f}"
-        
-        if metric_name == "Avg Degree": 
-            avg_deg = sum(d for _, d in G.degree()) / n
-            return f"{avg_deg:.2f}"
-        
-        # --- Structural Complexity ---
-        if metric_name == "Avg Cycle Length":
-            try:
-                cycles = list(nx.simple_cycles(G))
-                if not cycles: return "0.0 (None)"
-                lengths = [len(c) for c in cycles]
-                return f"{(sum(lengths) / len(lengths)):.2f}"
-            except: return "Err"
-            
-        if metric_name == "Cyclomatic Number":
-            # Fundamental complexity: E - N + P
-            e = G.number_of_edges()
-            p = nx.number_weakly_connected_components(G)
-            return str(e - n + p)
-
-        if metric_name == "Total Cycles":
-            # Count capped at 100 for performance on dense graphs
-            count = 0
-            for _ in nx.simple_cycles(G):
-                count += 1
-                if count > 100: return "100+"
-            return str(count)
-
-        # --- Resilience & Connectivity ---
-        if metric_name == "Global Efficiency":
-            # System integration (potential for information flow)
-            eff = nx.global_efficiency(G.to_undirected())
-            return f"{eff:.3f}"
-
-        if metric_name == "Modularity":
-            # Structural coupling (Q-Score)
-            communities = nx.community.greedy_modularity_communities(G.to_undirected())
-            q_score = nx.community.modularity(G.to_undirected(), communities)
-            return f"Q={q_score:.2f} ({len(communities)} Grps)"
-
-        if metric_name == "Brittleness Ratio":
-            # Balance of Soft (Supportive) vs. Hard (Essential) interdependencies
-            soft = sum(1 for u, v, d in G.edges(data=True) if d.get('type') == config.EDGE_TYPE_SOFT)
-            hard = sum(1 for u, v, d in G.edges(data=True) if d.get('type') == config.EDGE_TYPE_HARD)
-            if hard == 0: return "Inf (No Hard Edges)"
-            return f"{(soft / hard):.2f} (S:{soft}/H:{hard})"
-
-        if metric_name == "Supportive Gain":
-            # Measures efficiency loss if soft/assistive links are removed
-            eff_total = nx.global_efficiency(G.to_undirected())
-            hard_edges = [(u, v) for u, v, d in G.edges(data=True) if d.get('type') == config.EDGE_TYPE_HARD]
-            G_hard = nx.Graph()
-            G_hard.add_nodes_from(G.nodes())
-            G_hard.add_edges_from(hard_edges)
-            eff_hard = nx.global_efficiency(G_hard)
-            return f"{(eff_total - eff_hard):.3f} (Tot: {eff_total:.2f})"
-
-        if metric_name == "Critical Vulnerability":
-            # Checks if the essential 'Hard' skeleton remains connected
-            hard_edges = [(u, v) for u, v, d in G.edges(data=True) if d.get('type') == config.EDGE_TYPE_HARD]
-            G_hard = nx.DiGraph()
-            G_hard.add_nodes_from(G.nodes())
-            G_hard.add_edges_from(hard_edges)
-            num_comps = nx.number_weakly_connected_components(G_hard)
-            return "Robust (1 Comp)" if num_comps == 1 else f"Fractured ({num_comps} Comps)"
-
-        # --- Shared Authority & Coordination ---
-        if metric_name == "Interdependence":
-            # Ratio of edges crossing agent boundaries
-            m = G.number_of_edges()
-            if m == 0: return "0.000"
-            cross = 0
-            for u, v in G.edges():
-                if G.nodes[u].get('agent') != G.nodes[v].get('agent'):
-                    cross += 1
-            return f"{(cross / m):.3f}"
-
-        if metric_name == "Functional Redundancy":
-            # Average number of agents assigned per Function (backup capacity)
-            total_agents, func_count = 0, 0
-            for n, d in G.nodes(data=True):
-                if d.get('type') == 'Function':
-                    ag = d.get('agent', [])
-                    real_agents = [x for x in (ag if isinstance(ag, list) else [ag]) if x != "Unassigned"]
-                    total_agents += len(real_agents)
-                    func_count += 1
-            if func_count == 0: return "0.0"
-            return f"{(total_agents / func_count):.2f}"
-
-        if metric_name == "Agent Criticality":
-            # Identifies the agent with the most 'Sole Authority' functions
-            sole_counts = {}
-            for n, d in G.nodes(data=True):
-                if d.get('type') == 'Function':
-                    ag = d.get('agent', [])
-                    real = [x for x in (ag if isinstance(ag, list) else [ag]) if x != "Unassigned"]
-                    if len(real) == 1:
-                        sole_counts[real[0]] = sole_counts.get(real[0], 0) + 1
-            if not sole_counts: return "None (Robust)"
-            worst = max(sole_counts, key=sole_counts.get)
-            return f"{worst} ({sole_counts[worst]} Sole)"
-        
-        if metric_name == "Collaboration Ratio":
-            # Percent of functions involving joint activity (multiple agents)
-            shared, total = 0, 0
-            for n, d in G.nodes(data=True):
-                if d.get('type') == 'Function':
-                    ag = d.get('agent', [])
-                    real = [x for x in (ag if isinstance(ag, list) else [ag]) if x != "Unassigned"]
-                    if real:
-                        total += 1
-                        if len(real) > 1: shared += 1
-            if total == 0: return "0.0%"
-            return f"{((shared / total) * 100):.1f}%"
-            
+        if UG is None: UG = G.to_undirected(as_view=True)
+        return handler(G, n, UG)
     except Exception as e:
         print(f"Error calculating {metric_name}: {e}")
         return "Err"
-    
-    return ""
\ No newline at end of file